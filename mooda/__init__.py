@@ -1,8 +1,33 @@
 """ Implementation of mooda """
-
+from ._lazy import lazy_package
 from .waterframe import WaterFrame
-from .input import read_nc, read_pkl, read_df, from_erddap, read_dat_td_pati
-from .util import concat, iplot_location, iplot_timeseries, md5, \
-    es_create_indexes, widget_qc, widget_save, iplot_line
 
 __version__ = '2.0.0'
+
+# Readers and utilities are imported the first time they are used
+lazy_package(__name__, {
+    'WaterFrame': ('.waterframe', 'WaterFrame'),
+    'read_nc': ('.input', 'read_nc'),
+    'read_nc_iter': ('.input', 'read_nc_iter'),
+    'read_pkl': ('.input', 'read_pkl'),
+    'read_parquet': ('.input', 'read_parquet'),
+    'read_json': ('.input', 'read_json'),
+    'read_jsonl': ('.input', 'read_jsonl'),
+    'read_csv': ('.input', 'read_csv'),
+    'read_df': ('.input', 'read_df'),
+    'from_erddap': ('.input', 'from_erddap'),
+    'read_dat_td_pati': ('.input', 'read_dat_td_pati'),
+    'get_option': ('.options', 'get_option'),
+    'set_option': ('.options', 'set_option'),
+    'cache': ('.cache', None),
+    'concat': ('.util', 'concat'),
+    'iplot_location': ('.util', 'iplot_location'),
+    'iplot_timeseries': ('.util', 'iplot_timeseries'),
+    'md5': ('.util', 'md5'),
+    'compact_qc': ('.util', 'compact_qc'),
+    'flag_labels': ('.util', 'flag_labels'),
+    'es_create_indexes': ('.util', 'es_create_indexes'),
+    'widget_qc': ('.util', 'widget_qc'),
+    'widget_save': ('.util', 'widget_save'),
+    'iplot_line': ('.util', 'iplot_line'),
+})
@@ -0,0 +1,88 @@
+"""
+Lazy loading of the functions of mooda.
+The functions of a package, and the methods of WaterFrame, are imported from their modules the
+first time they are used (PEP 562), so the heavy libraries of each module (xarray, gsw, flask,
+elasticsearch, matplotlib, plotly, scikit-learn, ipywidgets...) are only imported when needed.
+tests/test_import.py checks that 'import mooda' does not import them.
+"""
+import importlib
+import sys
+from types import ModuleType
+
+
+class LazyPackage(ModuleType):
+    """
+    Class of a package whose attributes are imported the first time they are used.
+    """
+    _lazy_attributes = {}
+
+    def __getattr__(self, name):
+        try:
+            module_name, attribute = self._lazy_attributes[name]
+        except KeyError:
+            raise AttributeError(
+                f"module '{self.__name__}' has no attribute '{name}'") from None
+        value = importlib.import_module(module_name, self.__name__)
+        if attribute is not None:
+            value = getattr(value, attribute)
+        ModuleType.__setattr__(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        # The import system saves each submodule as an attribute of its package. A submodule must
+        # not replace the function with the same name (ex: qc.qc_flat_test).
+        if isinstance(value, ModuleType) and self._lazy_attributes.get(name, (None, None))[1]:
+            return
+        ModuleType.__setattr__(self, name, value)
+
+    def __dir__(self):
+        return sorted(set(ModuleType.__dir__(self)) | set(self._lazy_attributes))
+
+
+def lazy_package(package_name, attributes):
+    """
+    It makes the attributes of a package be imported the first time they are used.
+
+    Parameters
+    ----------
+        package_name: str
+            __name__ of the package.
+        attributes: dict
+            {name: (module, attribute)}. The module can be relative to the package. If attribute
+            is None, the value of name is the module.
+    """
+    package = sys.modules[package_name]
+    package.__class__ = type(
+        'LazyPackage', (LazyPackage,), {'_lazy_attributes': dict(attributes)})
+    package.__all__ = list(attributes)
+
+
+class LazyMethod:
+    """
+    Method of a class that is imported from its module the first time it is used. Then, the
+    method replaces the LazyMethod in the class.
+
+    Parameters
+    ----------
+        module_name: str
+            Absolute name of the module with the function of the method.
+        function_name: str
+            Name of the function. If it is None, the name of the method.
+    """
+    def __init__(self, module_name, function_name=None):
+        self.module_name = module_name
+        self.function_name = function_name
+        self.name = function_name
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        if self.function_name is None:
+            self.function_name = name
+
+    def __get__(self, instance, owner=None):
+        if owner is None:
+            owner = type(instance)
+        function = getattr(importlib.import_module(self.module_name), self.function_name)
+        setattr(owner, self.name, function)
+        return function.__get__(instance, owner)
+
@@ -0,0 +1,190 @@
+"""
+Cache of decoded WaterFrames.
+The columns and the index of WaterFrame.data are saved as .npy files that are memory-mapped when
+they are loaded, so they are not copied into memory and the same pages are shared between
+processes. The cache directory is MOODA_CACHE_DIR (environment variable) or ~/.cache/mooda.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from .waterframe import WaterFrame
+from .util.json_default import json_default
+from .util.md5 import md5
+
+CACHE_DIR = os.environ.get(
+    'MOODA_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'mooda'))
+
+
+def cache_key(path, cache_dir=None, **options):
+    """
+    It returns the key of a file in the cache. The key depends on the content (MD5) of the file
+    and on the options used to read it. The MD5 is only calculated again when the path, the size
+    or the modification time of the file change.
+
+    Parameters
+    ----------
+        path: str
+            Path of the source file.
+        cache_dir: str
+            Cache directory. If it is None, CACHE_DIR.
+        **options:
+            Arguments of the reader that change the resulting WaterFrame.
+
+    Returns
+    -------
+        key: str
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    stat = os.stat(path)
+    source = f'{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}'
+    source_path = os.path.join(
+        cache_dir, 'md5', hashlib.md5(source.encode()).hexdigest() + '.md5')
+
+    try:
+        with open(source_path) as source_file:
+            file_md5 = source_file.read()
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(source_path), exist_ok=True)
+        file_md5 = md5(path, md5_path=source_path)
+
+    options = json.dumps(options, sort_keys=True, default=json_default)
+    return hashlib.md5(f'{file_md5}:{options}'.encode()).hexdigest()
+
+
+def _save_array(folder, name, values):
+    """
+    Save an array into folder/name.npy and return True if it can be memory-mapped.
+    """
+    values = np.asarray(values)
+    np.save(os.path.join(folder, name + '.npy'), values, allow_pickle=True)
+    return values.dtype != object
+
+
+def _load_array(folder, name, mmap):
+    return np.load(os.path.join(folder, name + '.npy'),
+                   mmap_mode='c' if mmap else None, allow_pickle=not mmap)
+
+
+def save_waterframe(wf, key, cache_dir=None):
+    """
+    Save a WaterFrame into the cache. QC columns with flags between 0 and 255 are saved as
+    uint8.
+
+    Parameters
+    ----------
+        wf: WaterFrame
+        key: str
+            Key from cache_key().
+        cache_dir: str
+            Cache directory. If it is None, CACHE_DIR.
+
+    Returns
+    -------
+        folder: str
+            Folder of the WaterFrame in the cache.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    folder = os.path.join(cache_dir, key)
+
+    # Write into a temporary folder and rename it, so other processes never read half a cache
+    tmp_folder = tempfile.mkdtemp(dir=cache_dir)
+
+    data = wf.data
+    index = data.index
+    info = {
+        'columns': [],
+        'index_names': list(index.names),
+        'levels': [],
+        'metadata': wf.metadata,
+        'vocabulary': wf.vocabulary,
+    }
+
+    for position, column in enumerate(data.columns):
+        values = data.iloc[:, position].to_numpy()
+        if '_QC' in str(column) and values.dtype.kind in 'iuf':
+            compact = values.astype(np.uint8)
+            if np.array_equal(compact, values):
+                values = compact
+        mmap = _save_array(tmp_folder, f'column_{position}', values)
+        info['columns'].append((column, mmap))
+
+    if isinstance(index, pd.MultiIndex):
+        for position in range(index.nlevels):
+            level_mmap = _save_array(tmp_folder, f'level_{position}', index.levels[position])
+            codes_mmap = _save_array(tmp_folder, f'codes_{position}', index.codes[position])
+            info['levels'].append((level_mmap, codes_mmap))
+    else:
+        info['index_mmap'] = _save_array(tmp_folder, 'index', index)
+
+    with open(os.path.join(tmp_folder, 'waterframe.json'), 'w') as info_file:
+        json.dump(info, info_file, default=json_default)
+
+    try:
+        os.rename(tmp_folder, folder)
+    except OSError:
+        # Other process has saved the same WaterFrame
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+
+    return folder
+
+
+def load_waterframe(key, cache_dir=None):
+    """
+    Get a WaterFrame from the cache. Numeric arrays are memory-mapped in copy-on-write mode:
+    they are not copied into memory, and changes of the WaterFrame are not saved in the cache.
+
+    Parameters
+    ----------
+        key: str
+            Key from cache_key().
+        cache_dir: str
+            Cache directory. If it is None, CACHE_DIR.
+
+    Returns
+    -------
+        wf: WaterFrame
+            If the key is not in the cache, it returns None.
+    """
+    folder = os.path.join(cache_dir or CACHE_DIR, key)
+    try:
+        with open(os.path.join(folder, 'waterframe.json')) as info_file:
+            info = json.load(info_file)
+    except FileNotFoundError:
+        return None
+
+    if info['levels']:
+        levels = []
+        codes = []
+        for position, (level_mmap, codes_mmap) in enumerate(info['levels']):
+            levels.append(_load_array(folder, f'level_{position}', level_mmap))
+            codes.append(_load_array(folder, f'codes_{position}', codes_mmap))
+        index = pd.MultiIndex(levels=levels, codes=codes, names=info['index_names'],
+                              verify_integrity=False)
+    else:
+        index = pd.Index(_load_array(folder, 'index', info['index_mmap']),
+                         name=info['index_names'][0], copy=False)
+
+    columns = {}
+    for position, (column, mmap) in enumerate(info['columns']):
+        columns[column] = _load_array(folder, f'column_{position}', mmap)
+
+    data = pd.DataFrame(columns, index=index, copy=False)
+
+    return WaterFrame(df=data, metadata=info['metadata'], vocabulary=info['vocabulary'])
+
+
+def clear(cache_dir=None):
+    """
+    Delete all the WaterFrames of the cache.
+
+    Parameters
+    ----------
+        cache_dir: str
+            Cache directory. If it is None, CACHE_DIR.
+    """
+    shutil.rmtree(cache_dir or CACHE_DIR, ignore_errors=True)
@@ -1,7 +1,15 @@
 """ Input functions """
-from .read_nc import read_nc
-from .read_pkl import read_pkl
-from .read_json import read_json
-from .from_erddap import from_erddap
-from .read_df import read_df
-from .read_dat_td_pati import read_dat_td_pati
+from .._lazy import lazy_package
+
+lazy_package(__name__, {
+    'read_nc': ('.read_nc', 'read_nc'),
+    'read_nc_iter': ('.read_nc', 'read_nc_iter'),
+    'read_pkl': ('.read_pkl', 'read_pkl'),
+    'read_parquet': ('.read_parquet', 'read_parquet'),
+    'read_json': ('.read_json', 'read_json'),
+    'read_jsonl': ('.read_jsonl', 'read_jsonl'),
+    'read_csv': ('.read_csv', 'read_csv'),
+    'from_erddap': ('.from_erddap', 'from_erddap'),
+    'read_df': ('.read_df', 'read_df'),
+    'read_dat_td_pati': ('.read_dat_td_pati', 'read_dat_td_pati'),
+})
@@ -1,6 +1,7 @@
 from erddapClient import ERDDAP_Tabledap
 from collections import OrderedDict
 from ..waterframe import WaterFrame
+from ..util.qc_flags import compact_qc, new_flags
 
 
 def from_erddap(server, dataset_id, variables=None, constraints=None, rcsvkwargs={}, auth=None):
@@ -56,7 +57,8 @@ def from_erddap(server, dataset_id, variables=None, constraints=None, rcsvkwargs
         if f'{key}_QC' in keys:
             continue
         else:
-            _df[f'{key}_QC'] = 0
+            _df[f'{key}_QC'] = new_flags(len(_df))
+    compact_qc(_df)
 
     # Set index
     _df.set_index(['DEPTH', 'TIME'], drop=True, inplace=True)
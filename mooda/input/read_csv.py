@@ -0,0 +1,171 @@
+""" Implementation of mooda.read_csv(path) """
+import ast
+import csv
+import io
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from ..waterframe import WaterFrame
+from .read_json import INDEX_COLUMNS
+from .read_jsonl import restore_dtypes
+
+
+def header_value(value):
+    """
+    It returns the Python value (a number, a list, ...) of a value of the header of the CSV
+    file that WaterFrame.to_csv() wrote from a value that is not a str. If the value cannot be
+    evaluated, it returns the str.
+    """
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return value
+
+
+def parse_header(lines):
+    """
+    It parses the lines with a # as first character of a CSV file created with
+    WaterFrame.to_csv().
+
+    Parameters
+    ----------
+        lines: list of str
+            Lines of the header, without the '# '.
+
+    Returns
+    -------
+        (metadata, vocabulary, index, dtypes): (dict, dict, list, dict)
+            index and dtypes are None if the file does not have them. Values of the metadata
+            and the vocabulary are str, except the typed values of the 'typed' line.
+    """
+    metadata = {}
+    vocabulary = {}
+    index = None
+    dtypes = None
+    typed = {}
+
+    section = None
+    key = None
+    for line in lines:
+        if line in ['METADATA', 'VOCABULARY', 'DATA']:
+            section = line
+            continue
+        if section == 'METADATA':
+            name, _, value = line.partition(': ')
+            metadata[name] = value
+        elif section == 'VOCABULARY':
+            if line.startswith('  - ') and key is not None:
+                name, _, value = line[4:].partition(': ')
+                vocabulary[key][name] = value
+            else:
+                key = line[:-1] if line.endswith(':') else line
+                vocabulary[key] = {}
+        elif section == 'DATA':
+            name, _, value = line.partition(': ')
+            if name == 'index':
+                index = json.loads(value)
+            elif name == 'dtypes':
+                dtypes = json.loads(value)
+            elif name == 'typed':
+                typed = json.loads(value)
+
+    # Only the values written from other types than str are evaluated, so a str as '12345'
+    # is not changed
+    for name in typed.get('metadata', []):
+        if name in metadata:
+            metadata[name] = header_value(metadata[name])
+    for key, names in typed.get('vocabulary', {}).items():
+        for name in names:
+            if name in vocabulary.get(key, {}):
+                vocabulary[key][name] = header_value(vocabulary[key][name])
+    return metadata, vocabulary, index, dtypes
+
+
+def arrow_type(dtype):
+    """
+    It returns the pyarrow type used to read a column with the dtype, or None if pyarrow
+    must infer it.
+    """
+    if dtype == 'object':
+        return pa.string()
+    if dtype.startswith('datetime64') and ', ' in dtype:
+        unit, tz = dtype[len('datetime64['):-1].split(', ')
+        return pa.timestamp(unit, tz)
+    try:
+        return pa.from_numpy_dtype(np.dtype(dtype))
+    except (TypeError, pa.ArrowNotImplementedError):
+        return None
+
+
+def read_csv(path):
+    """
+    Get a WaterFrame from a CSV file created with WaterFrame.to_csv().
+    The metadata and the vocabulary are read from the lines with a # as first character (values
+    that were not str in the WaterFrame get their type back), and the data is read with the CSV reader of pyarrow with the dtypes saved in the file.
+    Empty fields are missing values, and quoted empty fields are empty strings.
+
+    Parameters
+    ----------
+        path: str
+            Location of the CSV file. Compressed files (.gz, .bz2, .zst, .lz4 or .br) are
+            decompressed while they are read.
+
+    Returns
+    -------
+        wf: WaterFrame
+    """
+    with pa.input_stream(path, compression='detect') as stream:
+        csv_file = io.BufferedReader(stream)
+
+        # Header lines, until the names of the columns
+        lines = []
+        while True:
+            line = csv_file.readline().decode('utf-8').rstrip('\r\n')
+            if line.startswith('#'):
+                lines.append(line[2:] if line.startswith('# ') else line[1:])
+            elif line or not csv_file.peek(1):
+                break
+        metadata, vocabulary, index, dtypes = parse_header(lines)
+        names = next(csv.reader([line])) if line else []
+
+        column_types = {}
+        for name, dtype in (dtypes or {}).items():
+            column_type = arrow_type(dtype)
+            if column_type is not None:
+                column_types[name] = column_type
+
+        if csv_file.peek(1):
+            # Empty fields are missing values, and quoted empty fields are empty strings
+            table = pa_csv.read_csv(
+                csv_file,
+                read_options=pa_csv.ReadOptions(column_names=names),
+                parse_options=pa_csv.ParseOptions(ignore_empty_lines=False),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=column_types, strings_can_be_null=True,
+                    quoted_strings_can_be_null=False))
+            data = table.to_pandas()
+        else:
+            # WaterFrame without rows
+            data = pd.DataFrame(columns=names)
+
+    if dtypes:
+        restore_dtypes(data, dtypes)
+    else:
+        # Dates inferred by pyarrow, in nanoseconds as the dates of the other readers
+        for column, dtype in data.dtypes.items():
+            if isinstance(dtype, np.dtype) and dtype.kind == 'M':
+                data[column] = data[column].astype('datetime64[ns]')
+
+    if index is None:
+        # Files of old versions: the index levels are the first columns
+        index = []
+        for name in names:
+            if name not in INDEX_COLUMNS:
+                break
+            index.append(name)
+    if index:
+        data.set_index(index, inplace=True)
+
+    return WaterFrame(df=data, metadata=metadata, vocabulary=vocabulary)
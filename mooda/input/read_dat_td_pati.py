@@ -4,6 +4,7 @@ This method allows to read data from the DIY DT used by the Pati Cientific
 import pandas as pd
 
 from ..waterframe import WaterFrame
+from ..util.qc_flags import new_flags
 
 
 def read_dat_td_pati(filename):
@@ -166,10 +167,10 @@ def read_dat_td_pati(filename):
     del df['num_mostres']
 
     df['DEPTH'] = 0
-    df['DEPTH_QC'] = 0
-    df['TIME_QC'] = 0
-    df['PRES_QC'] = 0
-    df['TEMP_QC'] = 0
+    df['DEPTH_QC'] = new_flags(len(df))
+    df['TIME_QC'] = new_flags(len(df))
+    df['PRES_QC'] = new_flags(len(df))
+    df['TEMP_QC'] = new_flags(len(df))
 
     df.set_index(['DEPTH', 'TIME'], inplace=True)
 
@@ -1,4 +1,5 @@
 from ..waterframe import WaterFrame
+from ..util.qc_flags import compact_qc, new_flags
 
 def read_df(df, index_time, index_depth=None, metadata={}, vocabulary={}):
     """
@@ -41,7 +42,8 @@ def read_df(df, index_time, index_depth=None, metadata={}, vocabulary={}):
         if f'{key}_QC' in keys:
             continue
         else:
-            _df[f'{key}_QC'] = 0
+            _df[f'{key}_QC'] = new_flags(len(_df))
+    compact_qc(_df)
 
     # Reindex
     _df.set_index(['DEPTH', 'TIME'], drop=True, inplace=True)
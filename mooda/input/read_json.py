@@ -1,11 +1,17 @@
 """ Implementation of a function to get a WaterFrame object from a JSON. """
+import ast
+import io
 import json
 import pandas as pd
+from ..waterframe import WaterFrame
 
+# Columns of the records that are levels of the index of WaterFrame.data
+INDEX_COLUMNS = ['DEPTH', 'TIME', 'LATITUDE', 'LONGITUDE']
 
-def read_json(self, json_string):
+
+def read_json(json_string):
     """
-    It gets a WaterFrame object from a JSON.
+    Get a WaterFrame from a JSON created with WaterFrame.to_json().
 
     Parameters
     ----------
@@ -14,25 +20,37 @@ def read_json(self, json_string):
 
     Returns
     -------
-        done: bool
-            True if the operation is successful.
+        wf: WaterFrame
     """
+    big_dict = json.loads(json_string)
+
+    wf = WaterFrame()
+    wf.metadata = dict(big_dict.get('metadata', {}))
+
+    # to_json() saves the values of the vocabulary as str
+    for key, value in big_dict.get('vocabulary', {}).items():
+        try:
+            wf.vocabulary[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            wf.vocabulary[key] = value
+
+    data = big_dict.get('data', '[]')
+    records = json.loads(data)
+    if isinstance(records, list):
+        # One object for each row, with the index levels and the columns
+        data = pd.DataFrame(records)
+        index_columns = []
+        for column in data.columns:
+            if column not in INDEX_COLUMNS:
+                break
+            index_columns.append(column)
+        if 'TIME' in index_columns:
+            data['TIME'] = pd.to_datetime(data['TIME'])
+        if index_columns:
+            data.set_index(index_columns, inplace=True)
+        wf.data = data
+    else:
+        # JSON of DataFrame.to_json(), the default layout of WaterFrame.to_json()
+        wf.data = pd.read_json(io.StringIO(data))
 
-    done = False
-    try:
-        big_dict = json.loads(json_string)
-
-        keys = big_dict.keys()
-        if "metadata" in keys:
-            self.metadata = big_dict["metadata"].copy()
-        if "vocabulary" in keys:
-            self.meaning = big_dict["vocabulary"].copy()
-        if "data" in keys:
-            self.data = pd.read_json(big_dict["data"])
-        else:
-            self.data = pd.read_json(big_dict)
-
-        done = True
-    except ValueError:
-        pass
-    return done
+    return wf
@@ -0,0 +1,80 @@
+""" Implementation of mooda.read_jsonl(path_or_buf, chunk_rows=100000) """
+import json
+from itertools import islice
+import pandas as pd
+from ..waterframe import WaterFrame
+
+
+def restore_dtypes(df, dtypes):
+    """
+    It changes the columns of the DataFrame to the dtypes saved by WaterFrame.to_jsonl().
+
+    Parameters
+    ----------
+        df: pandas.DataFrame
+        dtypes: dict
+            {column: name of the dtype}
+
+    Returns
+    -------
+        df: pandas.DataFrame
+    """
+    for column, dtype in dtypes.items():
+        if column not in df.columns or str(df[column].dtype) == dtype:
+            continue
+        if dtype.startswith('datetime64') and ', ' in dtype:
+            # Timezone-aware dates, as in 'datetime64[ns, UTC]'
+            tz = dtype[dtype.index(', ') + 2:-1]
+            df[column] = pd.to_datetime(df[column], utc=True).dt.tz_convert(tz)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def read_jsonl(path_or_buf, chunk_rows=100000):
+    """
+    Get a WaterFrame from a JSON Lines file created with WaterFrame.to_jsonl(). The lines are
+    read and parsed in blocks, and the index levels and the dtypes of the data are restored.
+
+    Parameters
+    ----------
+        path_or_buf: str or file object
+            Location of the file, or a file object (text or binary) positioned at the first
+            line.
+        chunk_rows: int, optional (chunk_rows = 100000)
+            Number of rows parsed at a time.
+
+    Returns
+    -------
+        wf: WaterFrame
+    """
+    if not hasattr(path_or_buf, 'read'):
+        with open(path_or_buf, 'rb') as jsonl_file:
+            return read_jsonl(jsonl_file, chunk_rows)
+
+    header = json.loads(path_or_buf.readline())
+    dtypes = header.get('dtypes', {})
+    keys = header.get('index', [])
+
+    blocks = []
+    while True:
+        lines = [line for line in islice(path_or_buf, chunk_rows) if line.strip()]
+        if not lines:
+            break
+        if isinstance(lines[0], bytes):
+            records = json.loads(b'[' + b','.join(lines) + b']')
+        else:
+            records = json.loads('[' + ','.join(lines) + ']')
+        blocks.append(restore_dtypes(pd.DataFrame(records, columns=list(dtypes)), dtypes))
+
+    if blocks:
+        data = pd.concat(blocks, ignore_index=True)
+    else:
+        data = restore_dtypes(pd.DataFrame(columns=list(dtypes)), dtypes)
+
+    if keys:
+        data.set_index(keys, inplace=True)
+        data.index.names = header.get('index_names', keys)
+
+    return WaterFrame(df=data, metadata=header.get('metadata', {}),
+                      vocabulary=header.get('vocabulary', {}))
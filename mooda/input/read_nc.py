@@ -1,28 +1,22 @@
+import datetime
+import itertools
+import cftime
 import xarray as xr
 import pandas as pd
 import numpy as np
 from ..waterframe import WaterFrame
+from ..cache import cache_key, load_waterframe, save_waterframe
+from ..util.qc_flags import compact_qc, new_flags
 
+# Keywords to identify non-measurement columns
+NON_MEASUREMENT_KEYWORDS = ["QC", "ENTITY", "SIZE", "ID", "CODE", "URL", "LINK"]
 
-def read_nc(path, decode_times=True):
-    """
-    Read data from NetCDF file and create a WaterFrame.
 
-    Parameters
-    ----------
-        path: str
-            Path of the NetCDF file.
-        decode_times : bool, optional
-            If True, decode times encoded in the standard NetCDF datetime format 
-            into datetime objects. Otherwise, leave them encoded as numbers. 
-    
-    Returns
-    -------
-        wf: WaterFrame
+def _open_dataset(path, decode_times=True):
+    """
+    Open a NetCDF file with xarray. Variables are not loaded into memory until they are used.
+    If decoding 'TIME' fails, it is decoded manually.
     """
-    # Create WaterFrame
-    wf = WaterFrame()
-
     try:
         # Open file with xarray (decode times)
         ds = xr.open_dataset(path, decode_times=decode_times)
@@ -57,31 +51,197 @@ def read_nc(path, decode_times=True):
             except Exception as e:
                 print(f"Error decoding 'TIME': {e}")
 
+    return ds
 
-    # Save dataset metadata and convert to DataFrame
-    wf.metadata = dict(ds.attrs)
-    wf.data = ds.to_dataframe()
 
-    # Normalize column names to uppercase
-    wf.data.columns = wf.data.columns.str.upper()
+def _column_name(variable):
+    """
+    Name of the WaterFrame.data column of a variable of the dataset.
+    """
+    # Normalize column names to uppercase and rename columns ending with _SEADATANET_QC to _QC
+    return variable.upper().replace("_SEADATANET_QC", "_QC")
 
-    # Rename columns ending with _SEADATANET_QC to _QC
-    wf.data.rename(columns=lambda col: col.replace("_SEADATANET_QC", "_QC"), inplace=True)
 
-    # Keywords to identify non-measurement columns
-    non_measurement_keywords = ["QC", "ENTITY", "SIZE", "ID", "CODE", "URL", "LINK"]
+def _unique_value(variable, block_size=1000000):
+    """
+    It reads the variable in blocks along its first dimension and stops as soon as it finds two
+    different values.
+
+    Returns
+    -------
+        (constant, value): (bool, object)
+            constant is True if the variable has only one unique value (NaN included).
+    """
+    if variable.ndim == 0 or variable.size <= block_size:
+        blocks = [variable]
+    else:
+        dim = variable.dims[0]
+        step = max(1, block_size * variable.sizes[dim] // variable.size)
+        blocks = (variable.isel({dim: slice(start, start + step)})
+                  for start in range(0, variable.sizes[dim], step))
+
+    found = False
+    value = None
+    for block in blocks:
+        unique_values = pd.unique(np.asarray(block.values).ravel())
+        if len(unique_values) > 1:
+            return False, None
+        if len(unique_values) == 1:
+            if not found:
+                found = True
+                value = unique_values[0]
+            elif not (value == unique_values[0] or
+                      (pd.isna(value) and pd.isna(unique_values[0]))):
+                return False, None
+    return found, value
+
+
+def _metadata_columns(ds):
+    """
+    It detects the non-numeric constant columns and the columns with suspicious names. The
+    unique values are checked on the variables of the dataset, before they are broadcasted to the
+    DataFrame index, so the result is the same for the whole file and for any slice of it.
 
-    # Detect non-numeric constant columns and columns with suspicious names
-    for col in wf.data.columns:
+    Returns
+    -------
+        metadata_columns: dict
+            {column name: unique value of the column or "SUSPICIOUS_COLUMN"}
+    """
+    metadata_columns = {}
+    for variable in ds.variables:
+        if variable in ds.indexes:
+            continue
+        col = _column_name(variable)
         if any(keyword in col for keyword in ["_QC", "LON", "LAT"]):
             continue
-        unique_values = wf.data[col].unique()
-        if (
-            len(unique_values) == 1  # Column has only one unique value
-            or (any(keyword in col for keyword in non_measurement_keywords) and col not in ["LATITUDE", "LONGITUDE"])
-        ):
+        suspicious = (any(keyword in col for keyword in NON_MEASUREMENT_KEYWORDS)
+                      and col not in ["LATITUDE", "LONGITUDE"])
+        constant, value = _unique_value(ds[variable])
+        if constant or suspicious:
             # Save the unique value or mark as metadata
-            wf.metadata[col] = unique_values[0] if len(unique_values) == 1 else "SUSPICIOUS_COLUMN"
+            metadata_columns[col] = value if constant else "SUSPICIOUS_COLUMN"
+    return metadata_columns
+
+
+def _vocabulary(ds):
+    """
+    Variable attributes of the dataset.
+    """
+    vocabulary = {}
+    for variable in ds.variables:
+        vocabulary[variable.upper()] = dict(ds[variable].attrs)
+    return vocabulary
+
+
+def _time_value(value, time):
+    """
+    It returns a date as a value comparable with the values of the TIME variable: a
+    numpy.datetime64, or a number in the units of TIME if the times are not decoded.
+    """
+    if value is None:
+        return None
+    if time.dtype.kind == 'M':
+        return np.datetime64(value)
+    units = time.attrs.get('units')
+    if units is None:
+        raise ValueError("TIME must have units to select rows by time.")
+    date = pd.Timestamp(value).to_pydatetime()
+    return cftime.date2num(date, units, time.attrs.get('calendar', 'standard'))
+
+
+def _select(ds, parameters=None, start=None, end=None, depths=None):
+    """
+    It selects the variables and the rows of the dataset before they are loaded into memory.
+
+    Parameters
+    ----------
+        ds: xarray.Dataset
+        parameters: str or list of str
+            Parameters to read. Their QC variables and the index coordinates are also read.
+            If parameters is None, all variables are read.
+        start: str, timestamp
+            Start time with format 'YYYYMMDDhhmmss' or timestamp.
+        end: str, timestamp
+            End time with format 'YYYYMMDDhhmmss' or timestamp.
+        depths: list of float
+            Values of DEPTH to read.
+
+    Returns
+    -------
+        (ds_variables, ds_rows): (xarray.Dataset, xarray.Dataset)
+            Dataset with the selected variables, and the same dataset with only the selected
+            rows.
+    """
+    columns = {_column_name(variable): variable for variable in ds.variables}
+
+    if parameters is not None:
+        if isinstance(parameters, str):
+            parameters = [parameters]
+        keep = set(ds.indexes)
+        for column in ["TIME", "DEPTH", "LATITUDE", "LONGITUDE"]:
+            if column in columns:
+                keep.add(columns[column])
+        for parameter in parameters:
+            if parameter not in columns:
+                raise KeyError(f"{parameter} is not a variable of the dataset.")
+            keep.add(columns[parameter])
+            if f"{parameter}_QC" in columns:
+                keep.add(columns[f"{parameter}_QC"])
+        ds = ds.drop_vars([variable for variable in ds.variables if variable not in keep])
+
+    def positions(column, mask_function):
+        variable = ds[columns[column]]
+        if variable.ndim != 1:
+            raise ValueError(f"{column} must be a variable with one dimension to select rows.")
+        return variable.dims[0], np.flatnonzero(mask_function(variable.values))
+
+    selection = {}
+    if start is not None or end is not None:
+        if isinstance(start, str):
+            start = datetime.datetime.strptime(start, '%Y%m%d%H%M%S')
+        if isinstance(end, str):
+            end = datetime.datetime.strptime(end, '%Y%m%d%H%M%S')
+
+        time = ds[columns["TIME"]]
+        start_time = _time_value(start, time)
+        end_time = _time_value(end, time)
+
+        def time_mask(values):
+            mask = np.ones(len(values), dtype=bool)
+            if start_time is not None:
+                mask &= values >= start_time
+            if end_time is not None:
+                mask &= values <= end_time
+            return mask
+        dim, index = positions("TIME", time_mask)
+        selection[dim] = index
+    if depths is not None:
+        dim, index = positions("DEPTH", lambda values: np.isin(values, depths))
+        if dim in selection:
+            index = np.intersect1d(selection[dim], index)
+        selection[dim] = index
+
+    return ds, ds.isel(selection)
+
+
+def _to_waterframe(ds, metadata, vocabulary, metadata_columns):
+    """
+    Create a WaterFrame from a (slice of a) dataset.
+    """
+    # Create WaterFrame
+    wf = WaterFrame()
+
+    # Save dataset metadata and convert to DataFrame
+    wf.metadata = dict(metadata)
+    wf.data = ds.to_dataframe()
+
+    wf.data.columns = [_column_name(col) for col in wf.data.columns]
+
+    # Move non-measurement columns to the metadata. The metadata columns are detected in the
+    # whole dataset, so the columns of the variables that were not selected are also saved.
+    for col, value in metadata_columns.items():
+        wf.metadata[col] = value
+        if col in wf.data.columns:
             wf.data.drop(columns=[col], inplace=True)
 
     # Add missing "_QC" columns for numeric data
@@ -90,7 +250,10 @@ def read_nc(path, decode_times=True):
             continue
         qc_column = f"{column}_QC"
         if qc_column not in wf.data.columns:
-            wf.data[qc_column] = 0
+            wf.data[qc_column] = new_flags(len(wf.data))
+
+    # QC flags as uint8
+    compact_qc(wf.data)
 
     # Ensure TIME, DEPTH, LATITUDE, and LONGITUDE are indices if they exist
     index_columns = []
@@ -103,7 +266,112 @@ def read_nc(path, decode_times=True):
         wf.data.set_index(index_columns, inplace=True, drop=True)
 
     # Save variable attributes to the vocabulary
-    for variable in ds.variables:
-        wf.vocabulary[variable.upper()] = dict(ds[variable].attrs)
+    wf.vocabulary = {key: dict(value) for key, value in vocabulary.items()}
 
     return wf
+
+
+def read_nc(path, decode_times=True, parameters=None, start=None, end=None, depths=None,
+            cache=False):
+    """
+    Read data from NetCDF file and create a WaterFrame.
+
+    Parameters
+    ----------
+        path: str
+            Path of the NetCDF file.
+        decode_times : bool, optional
+            If True, decode times encoded in the standard NetCDF datetime format
+            into datetime objects. Otherwise, leave them encoded as numbers.
+        parameters: str or list of str, optional (parameters = None)
+            Parameters to read. Their QC variables and the index coordinates are also read.
+            If parameters is None, all variables are read.
+        start: str, timestamp, optional (start = None)
+            Start time with format 'YYYYMMDDhhmmss' or timestamp.
+        end: str, timestamp, optional (end = None)
+            End time with format 'YYYYMMDDhhmmss' or timestamp.
+        depths: list of float, optional (depths = None)
+            Values of DEPTH to read. If depths is None, all depths are read.
+        cache: bool, optional (cache = False)
+            If True, the WaterFrame is saved in the cache of mooda (see mooda.cache) the first
+            time, and the next calls with the same file and arguments map it from the cache
+            instead of decoding the file again.
+
+    Returns
+    -------
+        wf: WaterFrame
+    """
+    if cache:
+        key = cache_key(path, reader='read_nc', decode_times=decode_times,
+                        parameters=parameters, start=start, end=end, depths=depths)
+        wf = load_waterframe(key)
+        if wf is not None:
+            return wf
+
+    ds = _open_dataset(path, decode_times=decode_times)
+    # Metadata and vocabulary of all the variables, before they are selected
+    vocabulary = _vocabulary(ds)
+    metadata_columns = _metadata_columns(ds)
+    ds, ds_rows = _select(ds, parameters, start, end, depths)
+
+    wf = _to_waterframe(ds_rows, dict(ds.attrs), vocabulary, metadata_columns)
+
+    if cache:
+        save_waterframe(wf, key)
+        # Return the memory-mapped WaterFrame, so all calls return the same
+        wf = load_waterframe(key)
+
+    return wf
+
+
+def read_nc_iter(path, chunks=None, decode_times=True, parameters=None, start=None, end=None,
+                 depths=None):
+    """
+    Read data from a NetCDF file in blocks and create a WaterFrame for each block.
+    Only the variables of one block are loaded into memory at a time, so it can read files
+    larger than the RAM. The metadata, the vocabulary and the columns of all the WaterFrames
+    are the same as the ones of read_nc(path).
+
+    Parameters
+    ----------
+        path: str
+            Path of the NetCDF file.
+        chunks: dict, optional (chunks = None)
+            Size of the blocks for each dimension of the file. Ex: {'TIME': 1000000}.
+            If chunks is None, the file is read in blocks of 1000000 values of TIME.
+        decode_times : bool, optional
+            If True, decode times encoded in the standard NetCDF datetime format
+            into datetime objects. Otherwise, leave them encoded as numbers.
+        parameters: str or list of str, optional (parameters = None)
+            Parameters to read, as in read_nc().
+        start: str, timestamp, optional (start = None)
+            Start time with format 'YYYYMMDDhhmmss' or timestamp.
+        end: str, timestamp, optional (end = None)
+            End time with format 'YYYYMMDDhhmmss' or timestamp.
+        depths: list of float, optional (depths = None)
+            Values of DEPTH to read. If depths is None, all depths are read.
+
+    Yields
+    ------
+        wf: WaterFrame
+    """
+    if chunks is None:
+        chunks = {'TIME': 1000000}
+
+    ds = _open_dataset(path, decode_times=decode_times)
+
+    # Metadata and vocabulary of all the variables, before they are selected
+    metadata = dict(ds.attrs)
+    vocabulary = _vocabulary(ds)
+    metadata_columns = _metadata_columns(ds)
+    _, ds = _select(ds, parameters, start, end, depths)
+
+    slices = []
+    for dim, size in chunks.items():
+        if dim not in ds.sizes:
+            raise KeyError(f"{dim} is not a dimension of {path}.")
+        slices.append([(dim, slice(start, start + size))
+                       for start in range(0, ds.sizes[dim], size)])
+
+    for block in itertools.product(*slices):
+        yield _to_waterframe(ds.isel(dict(block)), metadata, vocabulary, metadata_columns)
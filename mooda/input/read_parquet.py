@@ -0,0 +1,62 @@
+""" Implementation of mooda.read_parquet(path) """
+import datetime
+import json
+import pyarrow.parquet as pq
+from ..waterframe import WaterFrame
+
+
+def read_parquet(path, parameters=None, start=None, end=None):
+    """
+    Get a WaterFrame from a Parquet file created with WaterFrame.to_parquet().
+
+    Parameters
+    ----------
+        path: str
+            Location of the Parquet file.
+        parameters: str or list of str, optional (parameters = None)
+            Parameters to read. Their QC columns and the index are also read. Other columns are
+            not read from the file. If parameters is None, all columns are read.
+        start: str, timestamp, optional (start = None)
+            Start time with format 'YYYYMMDDhhmmss' or timestamp. Row groups without data
+            after start are not read from the file.
+        end: str, timestamp, optional (end = None)
+            End time with format 'YYYYMMDDhhmmss' or timestamp.
+
+    Returns
+    -------
+        wf: WaterFrame
+    """
+    columns = None
+    if parameters is not None:
+        if isinstance(parameters, str):
+            parameters = [parameters]
+        names = pq.read_schema(path).names
+        columns = []
+        for parameter in parameters:
+            if parameter not in names:
+                raise KeyError(f"{parameter} is not a parameter of the file.")
+            columns.append(parameter)
+            if f'{parameter}_QC' in names:
+                columns.append(f'{parameter}_QC')
+
+    filters = []
+    if start is not None:
+        if isinstance(start, str):
+            start = datetime.datetime.strptime(start, '%Y%m%d%H%M%S')
+        filters.append(('TIME', '>=', start))
+    if end is not None:
+        if isinstance(end, str):
+            end = datetime.datetime.strptime(end, '%Y%m%d%H%M%S')
+        filters.append(('TIME', '<=', end))
+
+    table = pq.read_table(path, columns=columns, filters=filters or None,
+                          use_pandas_metadata=True)
+
+    file_metadata = table.schema.metadata or {}
+
+    wf = WaterFrame()
+    wf.data = table.to_pandas()
+    wf.metadata = json.loads(file_metadata.get(b'mooda_metadata', b'{}'))
+    wf.vocabulary = json.loads(file_metadata.get(b'mooda_vocabulary', b'{}'))
+
+    return wf
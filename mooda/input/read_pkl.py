@@ -23,5 +23,8 @@ def read_pkl(path_pkl):
     wf_pkl.data = pickle_dataset.get('data')
     wf_pkl.vocabulary = pickle_dataset.get('vocabulary')
     wf_pkl.metadata = pickle_dataset.get('metadata')
+    if 'qc_state' in pickle_dataset:
+        # State of WaterFrame.qc_incremental()
+        wf_pkl.qc_state = pickle_dataset['qc_state']
 
     return wf_pkl
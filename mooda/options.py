@@ -0,0 +1,67 @@
+""" Global options of mooda """
+import pandas as pd
+
+OPTIONS = {
+    # If True, WaterFrame.copy() and the methods with inplace=False share the columns of data
+    # between WaterFrames instead of copying them. If None, they share them only when the
+    # copy-on-write mode of pandas is enabled, so pandas copies a shared column when one of the
+    # WaterFrames changes it. mooda does not change the options of pandas.
+    'copy_on_write': None,
+    # If True, the _QC columns created by the readers and the methods of mooda are uint8.
+    'compact_qc': True,
+}
+
+
+def get_option(name):
+    """
+    It returns the value of an option of mooda.
+
+    Parameters
+    ----------
+        name: str
+            Name of the option.
+
+    Returns
+    -------
+        value: object
+    """
+    if name not in OPTIONS:
+        raise KeyError(f"{name} is not an option of mooda. Options: {list(OPTIONS)}")
+    return OPTIONS[name]
+
+
+def pandas_copy_on_write():
+    """
+    It returns True if the copy-on-write mode of pandas is enabled. It is always enabled from
+    pandas 3.0.
+    """
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return pd.get_option('mode.copy_on_write') is True
+
+
+def share_data():
+    """
+    It returns True if the copies of WaterFrame.data share the columns, following the option
+    'copy_on_write'.
+    """
+    value = OPTIONS['copy_on_write']
+    if value is None:
+        return pandas_copy_on_write()
+    return bool(value)
+
+
+def set_option(name, value):
+    """
+    It changes the value of an option of mooda. The options of pandas are not changed.
+
+    Parameters
+    ----------
+        name: str
+            Name of the option.
+        value: object
+            New value of the option.
+    """
+    if name not in OPTIONS:
+        raise KeyError(f"{name} is not an option of mooda. Options: {list(OPTIONS)}")
+    OPTIONS[name] = value
@@ -1,6 +1,15 @@
 """ Implementation of util """
-from .concat import concat
-from .iplot import iplot_location, iplot_timeseries, iplot_line
-from .md5 import md5
-from .es_create_indexes import es_create_indexes
-from .md_widgets import widget_qc, widget_save
+from .._lazy import lazy_package
+
+lazy_package(__name__, {
+    'concat': ('.concat', 'concat'),
+    'iplot_location': ('.iplot', 'iplot_location'),
+    'iplot_timeseries': ('.iplot', 'iplot_timeseries'),
+    'iplot_line': ('.iplot', 'iplot_line'),
+    'md5': ('.md5', 'md5'),
+    'compact_qc': ('.qc_flags', 'compact_qc'),
+    'flag_labels': ('.qc_flags', 'flag_labels'),
+    'es_create_indexes': ('.es_create_indexes', 'es_create_indexes'),
+    'widget_qc': ('.md_widgets', 'widget_qc'),
+    'widget_save': ('.md_widgets', 'widget_save'),
+})
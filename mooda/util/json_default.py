@@ -0,0 +1,14 @@
+""" JSON encoder of the values of the metadata and the vocabulary """
+import numpy as np
+
+
+def json_default(value):
+    """
+    It converts the values of the metadata and the vocabulary that are not JSON serializable.
+    Use it as json.dumps(value, default=json_default).
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
@@ -29,8 +29,9 @@ def md5(file_path, save_md5=True, md5_path=None):
     # Make the MD5 code
     haser = hashlib.md5()
     with open(file_path, 'rb') as open_file:
-        content = open_file.read()
-        haser.update(content)
+        # Read the file in blocks to not load it in memory
+        for content in iter(lambda: open_file.read(1024 * 1024), b''):
+            haser.update(content)
     
     if save_md5:
         if md5_path:
@@ -0,0 +1,126 @@
+"""
+Storage of the QC flags. Flags take values from 0 to 9, so the _QC columns of WaterFrame.data are
+saved as uint8 (1 byte per value instead of the 8 bytes of int64 or float64).
+"""
+import numpy as np
+import pandas as pd
+from ..options import get_option
+
+QC_DTYPE = np.uint8
+
+# Flag used for the QC values that are missing (NaN) in the source data
+MISSING_FLAG = 9
+
+# Meanings of the flags (see docs/enhanced_qc.md)
+FLAG_MEANINGS = {
+    0: 'no_qc_performed',
+    1: 'good_data',
+    2: 'probably_good_data',
+    3: 'probably_bad_data',
+    4: 'bad_data',
+    5: 'value_changed',
+    6: 'value_below_detection',
+    7: 'value_in_excess',
+    8: 'interpolated_value',
+    9: 'missing_value',
+}
+
+
+def qc_dtype():
+    """
+    It returns the dtype of new QC columns: uint8 if the option 'compact_qc' of mooda is True,
+    and int64 otherwise.
+    """
+    return QC_DTYPE if get_option('compact_qc') else np.int64
+
+
+def new_flags(length, flag=0):
+    """
+    It returns an array of QC flags for a new _QC column.
+
+    Parameters
+    ----------
+        length: int
+            Number of values.
+        flag: int, optional (flag = 0)
+            Flag of all the values.
+
+    Returns
+    -------
+        flags: numpy.array
+    """
+    return np.full(length, flag, dtype=qc_dtype())
+
+
+def qc_flags(values):
+    """
+    It returns the values of a QC column as uint8. Missing values (NaN) are changed to
+    MISSING_FLAG.
+
+    Parameters
+    ----------
+        values: array-like
+            Values of a QC column.
+
+    Returns
+    -------
+        flags: numpy.array
+            If the values are not integers between 0 and 255, it returns the values without
+            changes.
+    """
+    values = np.asarray(values)
+    if values.dtype == QC_DTYPE or values.dtype.kind not in 'iuf':
+        return values
+    if values.dtype.kind == 'f':
+        values = np.where(np.isnan(values), MISSING_FLAG, values)
+    if len(values) and (values.min() < 0 or values.max() > 255):
+        return values
+    flags = values.astype(QC_DTYPE)
+    if values.dtype.kind == 'f' and not np.array_equal(flags, values):
+        return values
+    return flags
+
+
+def compact_qc(data):
+    """
+    It changes the _QC columns of data to uint8 in place, if the option 'compact_qc' of mooda
+    is True.
+
+    Parameters
+    ----------
+        data: pandas.DataFrame
+            WaterFrame.data
+
+    Returns
+    -------
+        data: pandas.DataFrame
+    """
+    if not get_option('compact_qc'):
+        return data
+    for column in data.columns:
+        if isinstance(column, str) and column.endswith('_QC'):
+            values = data[column].to_numpy()
+            flags = qc_flags(values)
+            if flags is not values:
+                data[column] = flags
+    return data
+
+
+def flag_labels(values):
+    """
+    It returns the flags as a pandas.Categorical with the meanings of FLAG_MEANINGS. It takes
+    1 byte per value, like uint8 flags.
+
+    Parameters
+    ----------
+        values: array-like
+            QC flags.
+
+    Returns
+    -------
+        labels: pandas.Categorical
+            Flags without meaning are NaN.
+    """
+    codes = np.asarray(values)
+    codes = np.where(np.isin(codes, list(FLAG_MEANINGS)), codes, -1).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=list(FLAG_MEANINGS.values()))
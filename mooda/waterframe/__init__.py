@@ -1,22 +1,70 @@
 # mooda/waterframe/__init__.py
 """ Main implementation of the class WaterFrame """
-import sys
-from pandas import DataFrame
+from pandas import DataFrame, concat
+from .._lazy import LazyMethod
+from .analysis.describe_fast import position_dict
+from .analysis.memory_report import index_memory, object_size
 
 
 class WaterFrame:
 
-    from .analysis import (
-        min, max, copy, use_only, rename, corr, max_diff, time_intervals, resample, slice_time,
-        info_metadata, info_vocabulary, drop, reduce_memory, pres2depth, psal2asal,
-        asal_temp2dens)
-    from .output import to_nc, to_pkl, to_json, to_es, metadata_to_html, to_csv
-    from .plot import plot_timeseries, plot_timebar, plot_hist, plot
-    from .qc import qc_flat_test, qc_range_test, qc_spike_test, qc_replace, qc_syntax_test
-    from .iplot import (
-        iplot_location, iplot_timeseries, iplot, iplot_scatter, iplot_line,
-        iplot_data_intervals, iplot_scatter_mapbox, iplot_bar_polar,
-        iplot_histogram, iplot_candlestick, iplot_box, iplot_correlation_headmap)
+    # The methods are imported from their modules the first time they are used
+    min = LazyMethod(f'{__name__}.analysis.min')
+    max = LazyMethod(f'{__name__}.analysis.max')
+    extrema = LazyMethod(f'{__name__}.analysis.extrema')
+    copy = LazyMethod(f'{__name__}.analysis.copy')
+    use_only = LazyMethod(f'{__name__}.analysis.use_only')
+    rename = LazyMethod(f'{__name__}.analysis.rename')
+    corr = LazyMethod(f'{__name__}.analysis.corr')
+    max_diff = LazyMethod(f'{__name__}.analysis.max_diff')
+    time_intervals = LazyMethod(f'{__name__}.analysis.time_intervals')
+    resample = LazyMethod(f'{__name__}.analysis.resample')
+    slice_time = LazyMethod(f'{__name__}.analysis.slice_time')
+    info_metadata = LazyMethod(f'{__name__}.analysis.info_metadata')
+    info_vocabulary = LazyMethod(f'{__name__}.analysis.info_vocabulary')
+    drop = LazyMethod(f'{__name__}.analysis.drop')
+    reduce_memory = LazyMethod(f'{__name__}.analysis.reduce_memory')
+    memory_report = LazyMethod(f'{__name__}.analysis.memory_report')
+    describe_fast = LazyMethod(f'{__name__}.analysis.describe_fast')
+    pres2depth = LazyMethod(f'{__name__}.analysis.pres2depth')
+    psal2asal = LazyMethod(f'{__name__}.analysis.psal2asal')
+    asal_temp2dens = LazyMethod(f'{__name__}.analysis.asal_temp2dens')
+
+    to_nc = LazyMethod(f'{__name__}.output.to_nc')
+    to_pkl = LazyMethod(f'{__name__}.output.to_pkl')
+    to_json = LazyMethod(f'{__name__}.output.to_json')
+    to_jsonl = LazyMethod(f'{__name__}.output.to_jsonl')
+    to_es = LazyMethod(f'{__name__}.output.to_es')
+    metadata_to_html = LazyMethod(f'{__name__}.output.metadata_to_html')
+    to_csv = LazyMethod(f'{__name__}.output.to_csv')
+    to_parquet = LazyMethod(f'{__name__}.output.to_parquet')
+
+    plot_timeseries = LazyMethod(f'{__name__}.plot.plot_timeseries')
+    plot_timebar = LazyMethod(f'{__name__}.plot.plot_timebar')
+    plot_hist = LazyMethod(f'{__name__}.plot.plot_hist')
+    plot = LazyMethod(f'{__name__}.plot.plot')
+
+    qc_flat_test = LazyMethod(f'{__name__}.qc.qc_flat_test')
+    qc_range_test = LazyMethod(f'{__name__}.qc.qc_range_test')
+    qc_spike_test = LazyMethod(f'{__name__}.qc.qc_spike_test')
+    qc_replace = LazyMethod(f'{__name__}.qc.qc_replace')
+    qc_syntax_test = LazyMethod(f'{__name__}.qc.qc_syntax_test')
+    qc_pipeline = LazyMethod(f'{__name__}.qc.qc_pipeline')
+    qc_multiparameter_test = LazyMethod(f'{__name__}.qc.qc_multiparameter_test')
+    qc_incremental = LazyMethod(f'{__name__}.qc.qc_incremental')
+
+    iplot_location = LazyMethod(f'{__name__}.iplot.iplot_location')
+    iplot_timeseries = LazyMethod(f'{__name__}.iplot.iplot_timeseries')
+    iplot = LazyMethod(f'{__name__}.iplot.iplot')
+    iplot_scatter = LazyMethod(f'{__name__}.iplot.iplot_scatter')
+    iplot_line = LazyMethod(f'{__name__}.iplot.iplot_line')
+    iplot_data_intervals = LazyMethod(f'{__name__}.iplot.iplot_data_intervals')
+    iplot_scatter_mapbox = LazyMethod(f'{__name__}.iplot.iplot_scatter_mapbox')
+    iplot_bar_polar = LazyMethod(f'{__name__}.iplot.iplot_bar_polar')
+    iplot_histogram = LazyMethod(f'{__name__}.iplot.iplot_histogram')
+    iplot_candlestick = LazyMethod(f'{__name__}.iplot.iplot_candlestick')
+    iplot_box = LazyMethod(f'{__name__}.iplot.iplot_box')
+    iplot_correlation_headmap = LazyMethod(f'{__name__}.iplot.iplot_correlation_headmap')
 
     def __init__(self, df=None, metadata=None, vocabulary=None):
         """ Constructor """
@@ -54,6 +102,8 @@ class WaterFrame:
 
         # Parameters message
         parameters_message = "Parameters:"
+        # Min, max and mean info of all parameters
+        description = self.describe_fast()
         for parameter in self.parameters:
             try:
                 parameters_message += f"\n  - {parameter}: " + \
@@ -63,11 +113,11 @@ class WaterFrame:
                 parameters_message += \
                     "\n  - {}: Parameter without meaning".format(parameter)
 
-            # Min, max and mean info
-            min_dict = self.min(parameter)
-            max_dict = self.max(parameter)
-            value_mean = self.data[parameter].mean()
-            if min_dict is not None and max_dict is not None:
+            argmin = description.at[parameter, 'argmin']
+            argmax = description.at[parameter, 'argmax']
+            if argmin >= 0 and argmax >= 0:
+                min_dict = position_dict(self.data, parameter, argmin)
+                max_dict = position_dict(self.data, parameter, argmax)
                 # min value string
                 parameters_message += f"\n    - Min value: {min_dict[parameter]}"
                 for key, value in min_dict.items():
@@ -83,7 +133,7 @@ class WaterFrame:
                     else:
                         parameters_message += f"\n      - {key}: {value}"
                 # mean value string
-                parameters_message += f"\n    - Mean value: {value_mean}"
+                parameters_message += f"\n    - Mean value: {description.at[parameter, 'mean']}"
             else:
                 parameters_message += "\n    - Parameter without values."
 
@@ -100,38 +150,86 @@ class WaterFrame:
         for key, value in self.metadata.items():
             metadata_list += f'<li><b>{key}</b>: {value}</li>'
 
-        dictionary_html = f'<div><p>Metadata:</p><ul>{metadata_list}</ul><p>Data:</p></div>'
-        return dictionary_html + f'{data_html}'
+        dictionary_html = f'<div><p>Metadata:</p><ul>{metadata_list}</ul></div>'
 
+        # Summary of the parameters
+        summary_html = ''
+        if self.parameters:
+            description = self.describe_fast()[['count', 'min', 'max', 'mean']]
+            summary_html = f'<div><p>Parameters:</p>{description.to_html()}</div>'
+
+        return dictionary_html + summary_html + f'<div><p>Data:</p></div>{data_html}'
+
+
+    @property
+    def data(self):
+        """
+        pandas.DataFrame with the data. The rows appended by WaterFrame.qc_incremental() are
+        concatenated the first time data is used after they are appended.
+        """
+        pending = self.__dict__.get('_pending_rows')
+        if pending:
+            self.__dict__['data'] = concat([self.__dict__['data']] + pending)
+            pending.clear()
+        return self.__dict__['data']
+
+    @data.setter
+    def data(self, df):
+        self.__dict__['data'] = df
+        self.__dict__['_pending_rows'] = []
+
+    def _append_rows(self, df):
+        """
+        It appends the rows of df to data without copying data. The rows are concatenated once,
+        the next time data is used, so several blocks of rows cost one concatenation.
+
+        Parameters
+        ----------
+            df: pandas.DataFrame
+                Rows with the same index and columns as data.
+        """
+        self.__dict__.setdefault('_pending_rows', []).append(df)
+
+    @property
+    def qc_columns(self):
+        """
+        Get a dictionary {parameter: QC column} with the keys of data with "QC" columns.
+        It is calculated again only when the columns of data change.
+        """
+        columns = self.data.columns
+        cache = self.__dict__.get('_qc_columns_cache')
+        if cache is None or cache[0] is not columns:
+            keys = set(key for key in columns if isinstance(key, str))
+            qc_columns = {}
+            for key in columns:
+                if not isinstance(key, str) or "_QC" in key:
+                    # Keys like Timestamps are not parameters
+                    continue
+                if f"{key}_QC" in keys:
+                    qc_columns[key] = f"{key}_QC"
+            # pandas creates a new columns Index every time the columns change
+            cache = (columns, qc_columns)
+            self._qc_columns_cache = cache
+        return dict(cache[1])
 
     @property
     def parameters(self):
         """
         Get the keys of data with "QC" columns.
         """
-        return_keys = []
-        keys = self.data.keys()
-        for key in keys:
-            try:
-                if "_QC" in key:
-                    continue
-                for key_qc in keys:
-                    if "_QC" not in key_qc:
-                        continue
-                    if key_qc == f"{key}_QC":
-                        return_keys.append(key)
-            except TypeError:
-                # TypeError: argument of type 'Timestamp' is not iterable
-                continue
-        return return_keys
+        return list(self.qc_columns)
 
     @property
     def memory_usage(self):
         """
-        It returns the memory usage of the WaterFrame in bytes.
+        It returns the memory usage of the WaterFrame in bytes: the buffers of the columns and
+        the index of data, including the Python objects they contain, plus the metadata and the
+        vocabulary. See WaterFrame.memory_report() for the usage of each column.
         """
-        size = sys.getsizeof(self.data) + sys.getsizeof(self.metadata)
-        return size
+        size = self.data.memory_usage(deep=True, index=False).sum()
+        size += sum(level_size for _, _, level_size in index_memory(self.data.index))
+        size += object_size(self.metadata) + object_size(self.vocabulary)
+        return int(size)
 
     @property
     def empty(self):
@@ -1,17 +1,24 @@
-from .copy import copy
-from .corr import corr
-from .min import min
-from .max import max
-from .use_only import use_only
-from .rename import rename
-from .max_diff import max_diff
-from .time_intervals import time_intervals
-from .resample import resample
-from .slice_time import slice_time
-from .info_metadata import info_metadata
-from .info_vocabulary import info_vocabulary
-from .drop import drop
-from .reduce_memory import reduce_memory
-from .pres2depth import pres2depth
-from .psal2asal import psal2asal
-from .asal_temp2dens import asal_temp2dens
\ No newline at end of file
+from ..._lazy import lazy_package
+
+lazy_package(__name__, {
+    'min': ('.min', 'min'),
+    'max': ('.max', 'max'),
+    'extrema': ('.extrema', 'extrema'),
+    'copy': ('.copy', 'copy'),
+    'use_only': ('.use_only', 'use_only'),
+    'rename': ('.rename', 'rename'),
+    'corr': ('.corr', 'corr'),
+    'max_diff': ('.max_diff', 'max_diff'),
+    'time_intervals': ('.time_intervals', 'time_intervals'),
+    'resample': ('.resample', 'resample'),
+    'slice_time': ('.slice_time', 'slice_time'),
+    'info_metadata': ('.info_metadata', 'info_metadata'),
+    'info_vocabulary': ('.info_vocabulary', 'info_vocabulary'),
+    'drop': ('.drop', 'drop'),
+    'reduce_memory': ('.reduce_memory', 'reduce_memory'),
+    'memory_report': ('.memory_report', 'memory_report'),
+    'describe_fast': ('.describe_fast', 'describe_fast'),
+    'pres2depth': ('.pres2depth', 'pres2depth'),
+    'psal2asal': ('.psal2asal', 'psal2asal'),
+    'asal_temp2dens': ('.asal_temp2dens', 'asal_temp2dens'),
+})
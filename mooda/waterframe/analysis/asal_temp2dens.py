@@ -2,6 +2,9 @@
 import numpy as np
 import gsw
 import pandas as pd
+from .copy import copy_data
+from ...util.qc_flags import new_flags
+from ..qc.qc_multiparameter_test import propagation_rules
 
 def asal_temp2dens(self, asal_parameter='ASAL', temp_parameter='TEMP',
                    pres_parameter='PRES', inplace=True):
@@ -27,31 +30,26 @@ def asal_temp2dens(self, asal_parameter='ASAL', temp_parameter='TEMP',
         new_wf: WaterFrame
     """
 
-    df_copy = self.data.copy()
+    df_copy = copy_data(self.data)
 
     df_copy['DENS'] = gsw.density.rho(df_copy[asal_parameter],
                                           df_copy[temp_parameter],
                                           df_copy[pres_parameter])
 
-    # Add QC
-    df_copy['DENS_QC'] = 1
-    # QC=0
-    df_copy.loc[df_copy[f'{asal_parameter}_QC'] == 0, 'DENS_QC'] = 0
-    df_copy.loc[df_copy[f'{temp_parameter}_QC'] == 0, 'DENS_QC'] = 0
-    df_copy.loc[df_copy[f'{pres_parameter}_QC'] == 0, 'DENS_QC'] = 0
-    # QC=4
-    df_copy.loc[df_copy[f'{asal_parameter}_QC'] == 4, 'DENS_QC'] = 4
-    df_copy.loc[df_copy[f'{temp_parameter}_QC'] == 4, 'DENS_QC'] = 4
-    df_copy.loc[df_copy[f'{pres_parameter}_QC'] == 4, 'DENS_QC'] = 4
-
-    new_wf = self.copy()
-    new_wf.data = df_copy.copy()
+    # Add QC: 0 or 4 if any input is 0 or 4
+    df_copy['DENS_QC'] = new_flags(len(df_copy), 1)
+    new_wf = self.copy(deep=False)
+    new_wf.data = df_copy
+    new_wf.qc_multiparameter_test(propagation_rules(
+        'DENS', [asal_parameter, temp_parameter, pres_parameter]))
+    df_copy = new_wf.data
     # Add vocabulary
     new_wf.vocabulary['DENS'] = {
         'long_name': 'In-situ density',
         'units': 'kg/m'}
 
     if inplace:
+        # self and the returned WaterFrame must not share data
         self.data = df_copy.copy()
         self.vocabulary = new_wf.vocabulary.copy()
 
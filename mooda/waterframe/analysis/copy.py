@@ -1,15 +1,48 @@
-""" Implementation of WaterFrame.copy() """
-from copy import deepcopy
+""" Implementation of WaterFrame.copy(deep=None) """
+from copy import copy as shallow_copy, deepcopy
+from ...options import share_data
 
 
-def copy(self):
+def copy(self, deep=None):
     """
     It returns a copy of the WaterFrame.
 
+    Parameters
+    ----------
+        deep: bool, optional (deep = None)
+            If True, data, metadata and vocabulary are copied.
+            If False, the new WaterFrame shares the columns of data with the WaterFrame (with
+            pandas copy-on-write, they are copied only when one of the WaterFrames changes
+            them), and it has its own metadata and vocabulary dictionaries.
+            If None, it is False when the copies share the columns of data, following the
+            option 'copy_on_write' of mooda (see mooda.set_option()), and True otherwise.
+
     Returns
     -------
         new_wf: WaterFrame
             A copy of the WaterFrame.
     """
-    new_wf = deepcopy(self)
+    if deep is None:
+        deep = not share_data()
+
+    if deep:
+        new_wf = deepcopy(self)
+    else:
+        new_wf = shallow_copy(self)
+        new_wf.data = self.data.copy(deep=False)
+        new_wf.metadata = dict(self.metadata)
+        new_wf.vocabulary = {
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in self.vocabulary.items()}
     return new_wf
+
+
+def copy_data(data, shared=False):
+    """
+    It returns a copy of WaterFrame.data for a new WaterFrame: a shallow copy if shared is True
+    or the copies share the columns of data (see the option 'copy_on_write' of mooda), and a
+    (deep) copy otherwise.
+    """
+    if shared or share_data():
+        return data.copy(deep=False)
+    return data.copy()
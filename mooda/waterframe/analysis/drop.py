@@ -31,9 +31,7 @@ def drop(self, parameters, inplace=True):
             self.vocabulary.pop(key)
         return True
     else:
-        new_wf = self.copy()
-        new_wf.vocabulary = self.vocabulary.copy()
-        new_wf.metadata = self.metadata.copy()
+        new_wf = self.copy(deep=False)
         new_wf.data = self.data.drop(keys, axis=1)
         for key in keys:
             new_wf.vocabulary.pop(key)
@@ -0,0 +1,65 @@
+""" Implementation of WaterFrame.extrema(parameters=None, qc_flags=[1]) """
+import numpy as np
+from .describe_fast import column_extrema, column_values, position_dict, valid_values
+
+
+def extrema(self, parameters=None, qc_flags=[1]):
+    """
+    It returns the minimum and maximum values of the parameters and their indexes, using
+    only the values with the input QC flags. Each parameter is reduced in its own buffer.
+
+    Parameters
+    ----------
+        parameters: str or list of str, optional (parameters = None)
+            Parameters to use. If parameters is None, all parameters are used.
+        qc_flags: list of int, optional (qc_flags = [1])
+            QC flags of the values to use. If qc_flags is None, all the values are used.
+
+    Returns
+    -------
+        extrema_dict: dict
+            Dictionary with the following format:
+            {
+                '<name of parameter>': {
+                    'min': <dictionary of WaterFrame.min()>,
+                    'max': <dictionary of WaterFrame.max()>
+                }
+            }
+            'min' and 'max' are None if the parameter does not have values with the QC flags.
+    """
+    if parameters is None:
+        parameters = self.parameters
+    elif isinstance(parameters, str):
+        parameters = [parameters]
+
+    data = self.data
+    positions = {}
+
+    numeric = [parameter for parameter in parameters if data[parameter].dtype.kind in 'biuf']
+    for parameter in numeric:
+        mask = None
+        if qc_flags is not None:
+            mask = np.isin(data[f'{parameter}_QC'].to_numpy(), qc_flags)
+        values = column_values(data, parameter)
+        positions[parameter] = column_extrema(values, valid_values(values, mask))
+
+    for parameter in parameters:
+        if parameter in positions:
+            continue
+        # Other types (strings, dates...) with pandas
+        series = data[parameter].reset_index(drop=True)
+        if qc_flags is not None:
+            series = series[np.isin(data[f'{parameter}_QC'].to_numpy(), qc_flags)]
+        try:
+            positions[parameter] = (series.idxmin(), series.idxmax())
+        except (TypeError, ValueError):
+            positions[parameter] = (-1, -1)
+
+    extrema_dict = {}
+    for parameter in parameters:
+        argmin, argmax = positions[parameter]
+        extrema_dict[parameter] = {
+            'min': position_dict(data, parameter, argmin) if argmin >= 0 else None,
+            'max': position_dict(data, parameter, argmax) if argmax >= 0 else None,
+        }
+    return extrema_dict
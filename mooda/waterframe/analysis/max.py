@@ -22,13 +22,6 @@ def max(self, parameter_max):
             If max_dict is None, all the values of the parameter are NaN.
     """
 
-    df = self.data[parameter_max]
-    df = df.reset_index()
-
-    try:
-        max_dict = df.loc[
-            df[parameter_max] == df[parameter_max].max(skipna=True)].to_dict('records')[0]
-    except IndexError:
-        max_dict = None
+    max_dict = self.extrema(parameter_max, qc_flags=None)[parameter_max]['max']
 
     return max_dict
@@ -0,0 +1,74 @@
+""" Implementation of WaterFrame.memory_report() """
+import sys
+import numpy as np
+import pandas as pd
+
+
+def object_size(value, seen=None):
+    """
+    It estimates the memory (bytes) used by a Python object and the objects it contains (dict,
+    list, tuple, set and numpy arrays), like the metadata and the vocabulary of a WaterFrame.
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (value.nbytes if value.base is not None else 0)
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += object_size(key, seen) + object_size(item, seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += object_size(item, seen)
+    return size
+
+
+def index_memory(index):
+    """
+    It returns a list of (name, dtype, bytes) with the memory used by each level of the index.
+    The memory of a level of a MultiIndex is the one of its unique values plus its codes.
+    """
+    if isinstance(index, pd.MultiIndex):
+        return [(name, str(level.dtype), level.memory_usage(deep=True) + codes.nbytes)
+                for name, level, codes in zip(index.names, index.levels, index.codes)]
+    return [(index.name, str(index.dtype), index.memory_usage(deep=True))]
+
+
+def memory_report(self):
+    """
+    It returns the memory used by each part of the WaterFrame: the levels of the index, the
+    parameters, the QC columns, the other columns of data, the metadata and the vocabulary.
+    The sum of the bytes is WaterFrame.memory_usage.
+
+    Returns
+    -------
+        report: pandas.DataFrame
+            DataFrame with the name of each part as index and the columns 'kind' ('index',
+            'parameter', 'qc', 'column', 'metadata' or 'vocabulary'), 'dtype' and 'bytes'.
+    """
+    qc_columns = self.qc_columns
+    qc_keys = set(qc_columns.values())
+
+    rows = [(name, 'index', dtype, size) for name, dtype, size in index_memory(self.data.index)]
+
+    column_sizes = self.data.memory_usage(deep=True, index=False)
+    for (column, dtype), size in zip(self.data.dtypes.items(), column_sizes.values):
+        if column in qc_columns:
+            kind = 'parameter'
+        elif column in qc_keys:
+            kind = 'qc'
+        else:
+            kind = 'column'
+        rows.append((column, kind, str(dtype), size))
+
+    rows.append(('metadata', 'metadata', 'dict', object_size(self.metadata)))
+    rows.append(('vocabulary', 'vocabulary', 'dict', object_size(self.vocabulary)))
+
+    report = pd.DataFrame(rows, columns=['name', 'kind', 'dtype', 'bytes'])
+    report['bytes'] = report['bytes'].astype(np.int64)
+    return report.set_index('name')
@@ -1,5 +1,5 @@
 """ Implementation of WaterFrame.min(parameter_name) """
-import numpy as np
+
 
 def min(self, parameter_min):
     """
@@ -22,12 +22,6 @@ def min(self, parameter_min):
             If min_dict is None, all the values of the parameter are NaN.
     """
 
-    df = self.data[parameter_min]
-    df = df.reset_index()
-
-    try:
-        min_dict = df.loc[df[parameter_min] == df[parameter_min].min(skipna=True)].to_dict('records')[0]
-    except IndexError:
-        min_dict = None
+    min_dict = self.extrema(parameter_min, qc_flags=None)[parameter_min]['min']
 
     return min_dict
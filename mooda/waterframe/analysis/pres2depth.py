@@ -25,9 +25,7 @@ def pres2depth(self, add_nominal_depth=True, density='sea-water', inplace=True):
             If min_dict is None, all the values of the parameter are NaN.
     """
 
-    df_copy = self.data.copy()
-
-    df_copy = df_copy.reset_index()
+    df_copy = self.data.reset_index()
 
     # Add QC flags from PRES
     df_copy['DEPTH_QC'] = df_copy['PRES_QC']
@@ -51,10 +49,11 @@ def pres2depth(self, add_nominal_depth=True, density='sea-water', inplace=True):
     df_copy['DEPTH'] = df_copy['PRES'] / dens
     df_copy.set_index(['TIME', 'DEPTH'], inplace=True)
     
-    wf_copy = self.copy()
-    wf_copy.data = df_copy.copy()
+    wf_copy = self.copy(deep=False)
+    wf_copy.data = df_copy
 
     if inplace:
+        # self and the returned WaterFrame must not share data
         self.data = df_copy.copy()
 
     return wf_copy
@@ -2,6 +2,9 @@
 import numpy as np
 import gsw
 import pandas as pd
+from .copy import copy_data
+from ...util.qc_flags import new_flags
+from ..qc.qc_multiparameter_test import propagation_rules
 
 def psal2asal(self, psal_parameter='PSAL', pres_parameter='PRES', lon='auto',
               lat='auto', inplace=True):
@@ -31,7 +34,7 @@ def psal2asal(self, psal_parameter='PSAL', pres_parameter='PRES', lon='auto',
         wf: WaterFrame
     """
 
-    df_copy = self.data.copy()
+    df_copy = copy_data(self.data)
     if lat == 'auto':
         lat_parameter = 'LATITUDE'
         df_copy['LATITUDE'] = float(self.metadata['last_latitude_observation'])
@@ -43,42 +46,40 @@ def psal2asal(self, psal_parameter='PSAL', pres_parameter='PRES', lon='auto',
         df_copy['LONGITUDE'] = float(self.metadata['last_longitude_observation'])
         df_copy['LONGITUDE_QC'] = 1
     else:
-        lon_parameter = 'lon'
+        lon_parameter = lon
 
     df_copy['ASAL'] = gsw.SA_from_SP(df_copy[psal_parameter],
                                      df_copy[pres_parameter],
                                      df_copy[lon_parameter],
                                      df_copy[lat_parameter])
 
-    # Add QC
-    df_copy['ASAL_QC'] = 1
-    # QC=0
-    df_copy.loc[df_copy[f'{psal_parameter}_QC'] == 0, 'ASAL_QC'] = 0
-    df_copy.loc[df_copy[f'{pres_parameter}_QC'] == 0, 'ASAL_QC'] = 0
-    df_copy.loc[df_copy[f'{lon_parameter}_QC'] == 0, 'ASAL_QC'] = 0
-    df_copy.loc[df_copy[f'{lat_parameter}_QC'] == 0, 'ASAL_QC'] = 0
-    # QC=4
-    df_copy.loc[df_copy[f'{psal_parameter}_QC'] == 4, 'ASAL_QC'] = 4
-    df_copy.loc[df_copy[f'{pres_parameter}_QC'] == 4, 'ASAL_QC'] = 4
-    df_copy.loc[df_copy[f'{lon_parameter}_QC'] == 4, 'ASAL_QC'] = 4
-    df_copy.loc[df_copy[f'{lat_parameter}_QC'] == 4, 'ASAL_QC'] = 4
-
-    # Delete lat and lon
+    # Delete lat and lon. Their flags from the metadata are always 1, so they do not change
+    # the flags of ASAL.
+    sources = [psal_parameter, pres_parameter]
     if lat == 'auto':
         del df_copy[f'{lat_parameter}_QC']
         del df_copy[lat_parameter]
+    else:
+        sources.append(lat_parameter)
     if lon == 'auto':
         del df_copy[f'{lon_parameter}_QC']
         del df_copy[lon_parameter]
+    else:
+        sources.append(lon_parameter)
 
-    new_wf = self.copy()
-    new_wf.data = df_copy.copy()
+    # Add QC: 0 or 4 if any input is 0 or 4
+    df_copy['ASAL_QC'] = new_flags(len(df_copy), 1)
+    new_wf = self.copy(deep=False)
+    new_wf.data = df_copy
+    new_wf.qc_multiparameter_test(propagation_rules('ASAL', sources))
+    df_copy = new_wf.data
     # Add vocabulary
     new_wf.vocabulary['ASAL'] = {
         'long_name': 'Absolute Salinity',
         'units': 'g/kg'}
 
     if inplace:
+        # self and the returned WaterFrame must not share data
         self.data = df_copy.copy()
         self.vocabulary = new_wf.vocabulary.copy()
 
@@ -27,7 +27,7 @@ def rename(self, actual_name, new_name, inplace=True):
     if inplace:
         new_wf = True
     else:
-        new_wf = self.copy()
+        new_wf = self.copy(deep=False)
         new_wf.data = new_data
 
     return new_wf
@@ -1,5 +1,6 @@
 """ Implementation of WaterFrame.resample(rule, method='mean') """
 import pandas as pd
+from ...util.qc_flags import new_flags
 
 def resample(self, rule, method='mean', inplace=True):
     """
@@ -57,12 +58,12 @@ def resample(self, rule, method='mean', inplace=True):
     # Change "_QC" values to 0
     for key in self.data.keys():
         if "_QC" in key:
-            data[key] = 0
+            data[key] = new_flags(len(data))
 
     if inplace:
         self.data = data
         return True
     else:
-        new_wf = self.copy()
+        new_wf = self.copy(deep=False)
         new_wf.data = data
         return new_wf
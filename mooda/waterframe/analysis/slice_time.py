@@ -38,6 +38,6 @@ def slice_time(self, start=None, end=None, inplace=True):
         self.data = data
         return True
     else:
-        new_wf = self.copy()
+        new_wf = self.copy(deep=False)
         new_wf.data = data
         return new_wf
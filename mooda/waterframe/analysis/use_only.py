@@ -23,13 +23,14 @@ def use_only(self, parameters_to_use, inplace=True):
         parameters_to_use = [parameters_to_use]
 
     # Check if all parameters_to_use exist
+    qc_columns = self.qc_columns
     parameters_qc = []
     for parameter_to_use in parameters_to_use:
-        if parameter_to_use not in self.parameters:
+        if parameter_to_use not in qc_columns:
             raise KeyError(f"{parameter_to_use} is not a parameter of the WaterFrame.")
         else:
-            parameters_qc.append(f"{parameter_to_use}_QC")
-    parameters_to_use += parameters_qc
+            parameters_qc.append(qc_columns[parameter_to_use])
+    parameters_to_use = list(parameters_to_use) + parameters_qc
 
     if inplace:
         self.data = self.data[parameters_to_use]
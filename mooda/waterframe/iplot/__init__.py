@@ -1,12 +1,16 @@
-from .iplot_location import iplot_location
-from .iplot_timeseries import iplot_timeseries
-from .iplot import iplot
-from .iplot_scatter import iplot_scatter
-from .iplot_line import iplot_line
-from .iplot_data_intervals import iplot_data_intervals
-from .iplot_scatter_mapbox import iplot_scatter_mapbox
-from .iplot_bar_polar import iplot_bar_polar
-from .iplot_histogram import iplot_histogram
-from .iplot_candlestick import iplot_candlestick
-from .iplot_box import iplot_box
-from .iplot_correlation_headmap import iplot_correlation_headmap
\ No newline at end of file
+from ..._lazy import lazy_package
+
+lazy_package(__name__, {
+    'iplot_location': ('.iplot_location', 'iplot_location'),
+    'iplot_timeseries': ('.iplot_timeseries', 'iplot_timeseries'),
+    'iplot': ('.iplot', 'iplot'),
+    'iplot_scatter': ('.iplot_scatter', 'iplot_scatter'),
+    'iplot_line': ('.iplot_line', 'iplot_line'),
+    'iplot_data_intervals': ('.iplot_data_intervals', 'iplot_data_intervals'),
+    'iplot_scatter_mapbox': ('.iplot_scatter_mapbox', 'iplot_scatter_mapbox'),
+    'iplot_bar_polar': ('.iplot_bar_polar', 'iplot_bar_polar'),
+    'iplot_histogram': ('.iplot_histogram', 'iplot_histogram'),
+    'iplot_candlestick': ('.iplot_candlestick', 'iplot_candlestick'),
+    'iplot_box': ('.iplot_box', 'iplot_box'),
+    'iplot_correlation_headmap': ('.iplot_correlation_headmap', 'iplot_correlation_headmap'),
+})
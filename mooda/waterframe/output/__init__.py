@@ -1,7 +1,13 @@
 """ Output functions from a WaterFrame """
-from .to_nc import to_nc
-from .to_pkl import to_pkl
-from .to_json import to_json
-from .to_es import to_es
-from .metadata_to_html import metadata_to_html
-from .to_csv import to_csv
+from ..._lazy import lazy_package
+
+lazy_package(__name__, {
+    'to_nc': ('.to_nc', 'to_nc'),
+    'to_pkl': ('.to_pkl', 'to_pkl'),
+    'to_json': ('.to_json', 'to_json'),
+    'to_jsonl': ('.to_jsonl', 'to_jsonl'),
+    'to_es': ('.to_es', 'to_es'),
+    'metadata_to_html': ('.metadata_to_html', 'metadata_to_html'),
+    'to_csv': ('.to_csv', 'to_csv'),
+    'to_parquet': ('.to_parquet', 'to_parquet'),
+})
@@ -0,0 +1,236 @@
+"""
+JSON documents of the rows of a WaterFrame.
+The documents are built column by column: each column is converted to JSON texts with numpy,
+the fields that are the same for all the rows are encoded only once, and the rows are
+processed in blocks, so the memory used does not depend on the number of rows.
+"""
+import json
+import numpy as np
+import pandas as pd
+from ...util.json_default import json_default
+
+
+def json_values(values):
+    """
+    It returns the JSON texts of the values of a column.
+
+    Parameters
+    ----------
+        values: numpy.array or pandas.Series
+            Values of a column.
+
+    Returns
+    -------
+        texts: numpy.array of str (dtype object)
+            NaN, NaT and infinite values are null.
+    """
+    values = np.asarray(values)
+    kind = values.dtype.kind
+    if kind == 'b':
+        texts = np.where(values, 'true', 'false').astype(object)
+    elif kind in 'iu':
+        texts = values.astype(str).astype(object)
+    elif kind == 'f':
+        texts = values.astype(str).astype(object)
+        texts[~np.isfinite(values)] = 'null'
+    elif kind == 'M':
+        texts = ('"' + np.datetime_as_string(values).astype(object) + '"')
+        texts[np.isnat(values)] = 'null'
+    else:
+        texts = np.array([
+            'null' if value is None or value is pd.NaT or value is pd.NA or
+            (isinstance(value, float) and not np.isfinite(value))
+            else json.dumps(value, default=json_default)
+            for value in values], dtype=object)
+    return texts
+
+
+def json_strings(values, safe=False):
+    """
+    It returns the values of a column as JSON strings, as in '"15.2"'. If safe is True or the
+    values are numeric, the texts are not escaped.
+    """
+    values = np.asarray(values)
+    if safe and values.dtype == object:
+        return '"' + values + '"'
+    if safe or values.dtype.kind in 'biufM':
+        return '"' + values.astype(str).astype(object) + '"'
+    return np.array([json.dumps(str(value)) for value in values], dtype=object)
+
+
+def json_records(fields, length):
+    """
+    It builds the JSON objects of a block of rows.
+
+    Parameters
+    ----------
+        fields: list of (str, object)
+            (key, texts) of each field, in order. texts is an array with the JSON text of each
+            row (see json_values()) or a str with the JSON text of all the rows.
+        length: int
+            Number of rows.
+
+    Returns
+    -------
+        records: numpy.array of str (dtype object)
+    """
+    # Join the constant parts of the records once
+    pieces = []
+    text = ''
+    for position, (key, texts) in enumerate(fields):
+        text += ('{' if position == 0 else ',') + json.dumps(key) + ':'
+        if isinstance(texts, str):
+            text += texts
+        else:
+            pieces.append(text)
+            pieces.append(texts)
+            text = ''
+    pieces.append(text + '}' if fields else '{}')
+
+    records = np.full(length, pieces[0], dtype=object)
+    for piece in pieces[1:]:
+        if len(piece):
+            records += piece
+    return records
+
+
+def index_keys(index):
+    """
+    It returns the keys of the index levels in the records: the names of the levels, or
+    'level_<position>' for the levels without name (as DataFrame.reset_index()). If no level
+    has name, the index is not saved in the records and it returns an empty list.
+    """
+    if all(name is None for name in index.names):
+        return []
+    return [f'level_{position}' if name is None else str(name)
+            for position, name in enumerate(index.names)]
+
+
+def index_fields(df):
+    """
+    It returns the fields (see json_records()) of the index levels and the columns of a
+    DataFrame, in this order.
+    """
+    fields = []
+    index = df.index
+    for position, key in enumerate(index_keys(index)):
+        fields.append((key, json_values(index.get_level_values(position))))
+    for position, column in enumerate(df.columns):
+        fields.append((str(column), json_values(df.iloc[:, position].to_numpy())))
+    return fields
+
+
+def record_blocks(df, chunk_rows=100000):
+    """
+    It yields the JSON objects of the rows of a DataFrame, in blocks. Each object has the index
+    levels and the columns of a row, as in {"DEPTH":1.0,"TIME":"2020-01-01T00:00:00",...}.
+
+    Parameters
+    ----------
+        df: pandas.DataFrame
+        chunk_rows: int, optional (chunk_rows = 100000)
+            Number of rows of each block.
+
+    Yields
+    ------
+        records: numpy.array of str (dtype object)
+    """
+    for start in range(0, len(df), chunk_rows):
+        block = df.iloc[start:start + chunk_rows]
+        yield json_records(index_fields(block), len(block))
+
+
+def time_strings(index):
+    """
+    It returns the strings of the TIME index used in the documents of ElasticSearch: the one
+    of the '_id' (as str(timestamp) with 'T') and the one of the 'time' field (first 19
+    characters).
+    """
+    if isinstance(index, pd.DatetimeIndex) and index.tz is None:
+        id_times = np.datetime_as_string(index.values, unit='s').astype(object)
+        fraction = index.values != index.values.astype('datetime64[s]')
+        if fraction.any():
+            id_times[fraction] = [str(value).replace(' ', 'T') for value in index[fraction]]
+    else:
+        id_times = np.array([str(value).replace(' ', 'T') for value in index], dtype=object)
+    times = np.array([value[:19].replace('T', ' ') for value in id_times], dtype=object)
+    return id_times, times
+
+
+def data_documents(df, parameter, metadata, vocabulary, data_index_name='data', chunk_size=500):
+    """
+    It builds the bulk requests (NDJSON) with the documents of the data of a parameter.
+
+    Parameters
+    ----------
+        df: pandas.DataFrame
+            Data with TIME as index and the columns parameter, parameter_QC, DEPH, DEPH_QC and
+            TIME_QC.
+        parameter: str
+            Parameter of the documents.
+        metadata: dict
+            WaterFrame.metadata
+        vocabulary: dict
+            WaterFrame.vocabulary
+        data_index_name: str
+            Name of the ElasticSearch index that contains the WaterFrame.data documents.
+        chunk_size: int
+            Number of documents of each chunk.
+
+    Yields
+    ------
+        documents: numpy.array of str (dtype object)
+            Documents of a chunk. Each document is the action line and the source line of the
+            bulk request, as in '{"index":{...}}\\n{"parameter":...}\\n'.
+    """
+    metadata_id = metadata['id']
+
+    # Fields with the same value in all the documents
+    action_start = json.dumps({'index': {'_index': data_index_name, '_id': ''}})[:-4]
+    id_start = json.dumps(f'{metadata_id}_{parameter}_')[:-1]
+    constants = [
+        ('metadata_id', metadata_id),
+        ('platform_code', metadata['platform_code']),
+        ('institution', metadata['institution']),
+        ('area', metadata['area']),
+        ('long_name', vocabulary[parameter]['long_name']),
+        ('units', vocabulary[parameter]['units']),
+        ('location', {
+            'lat': metadata['last_latitude_observation'],
+            'lon': metadata['last_longitude_observation'],
+        }),
+        ('location_qc', 0),
+    ]
+    constants = [(key, json.dumps(value, default=json_default)) for key, value in constants]
+
+    # Numeric rows were converted to float, as with df.iterrows()
+    dtype = float if all(kind in 'biuf' for kind in df.dtypes.map(lambda d: d.kind)) else object
+
+    # Documents are built in blocks of several chunks, to reduce the cost of each operation
+    block_size = chunk_size * max(1, 50000 // chunk_size)
+    for block_start in range(0, len(df), block_size):
+        block = df.iloc[block_start:block_start + block_size]
+        depths = np.asarray(block['DEPH'], dtype=dtype)
+        if dtype is float:
+            depths = depths.astype(str).astype(object)
+        else:
+            depths = np.array([str(depth) for depth in depths], dtype=object)
+        id_times, times = time_strings(block.index)
+
+        if dtype is float:
+            ids = id_start + id_times + '_' + depths + '"'
+        else:
+            ids = json_strings(f'{metadata_id}_{parameter}_' + id_times + '_' + depths)
+        actions = action_start + ids + '}}\n'
+        sources = json_records([
+            ('parameter', json.dumps(parameter)),
+            ('time', json_strings(times, safe=True)),
+            ('time_qc', json_values(block['TIME_QC'].to_numpy().astype(int))),
+            ('depth', json_strings(depths, safe=dtype is float)),
+            ('depth_qc', json_values(block['DEPH_QC'].to_numpy().astype(int))),
+            ('value', json_strings(np.asarray(block[parameter], dtype=dtype))),
+            ('value_qc', json_values(block[parameter + '_QC'].to_numpy().astype(int))),
+        ] + constants, len(block))
+        documents = actions + sources + '\n'
+        for start in range(0, len(documents), chunk_size):
+            yield documents[start:start + chunk_size]
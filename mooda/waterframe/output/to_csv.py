@@ -1,11 +1,97 @@
-""" Implementation fo WaterFrame.to_nc() """
+""" Implementation fo WaterFrame.to_csv() """
+import csv
+import io
+import json
+import re
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from ._documents import index_keys
 
+# Extensions of the files of each compression codec
+EXTENSIONS = {'gzip': '.gz', 'bz2': '.bz2', 'zstd': '.zst', 'lz4': '.lz4', 'brotli': '.br'}
 
-def to_csv(self, path=None):
+
+def csv_header(wf, keys):
+    """
+    It returns the lines with a # as first character of the CSV file of a WaterFrame: the
+    metadata, the vocabulary, the index and dtypes of the data, and the keys of the metadata
+    and vocabulary values that are not str (typed), which mooda.read_csv() evaluates.
+    """
+    index = wf.data.index
+    dtypes = {key: str(index.get_level_values(position).dtype)
+              for position, key in enumerate(keys)}
+    dtypes.update({str(column): str(dtype) for column, dtype in wf.data.dtypes.items()})
+
+    typed = {'metadata': [], 'vocabulary': {}}
+    lines = ['# METADATA']
+    for key, value in wf.metadata.items():
+        if value != '':
+            lines.append(f'# {key}: {value}')
+            if not isinstance(value, str):
+                typed['metadata'].append(str(key))
+    lines.append('')
+    lines.append('# VOCABULARY')
+    for key, definition in wf.vocabulary.items():
+        lines.append(f'# {key}:')
+        for key_definition, value_definition in definition.items():
+            lines.append(f'#   - {key_definition}: {value_definition}')
+            if not isinstance(value_definition, str):
+                typed['vocabulary'].setdefault(str(key), []).append(str(key_definition))
+    lines.append('')
+    lines.append('# DATA')
+    lines.append(f'# index: {json.dumps(keys)}')
+    lines.append(f'# dtypes: {json.dumps(dtypes)}')
+    lines.append(f'# typed: {json.dumps(typed)}')
+    lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+def decimals(float_format):
+    """
+    It returns the number of decimals of float_format (an int or a str as '%.3f').
+    """
+    if float_format is None or isinstance(float_format, int):
+        return float_format
+    match = re.fullmatch(r'%\.(\d+)f', str(float_format))
+    if match is None:
+        raise ValueError("float_format must be a number of decimals or a str as '%.3f'.")
+    return int(match.group(1))
+
+
+def whole_seconds(values):
+    """
+    It returns True if the values are dates without fractions of second.
+    """
+    if not isinstance(values.dtype, np.dtype) or values.dtype.kind != 'M':
+        return False
+    values = values.to_numpy()
+    return not ((values != values.astype('datetime64[s]')) & ~np.isnat(values)).any()
+
+
+def csv_table(df, float_decimals=None, seconds=()):
+    """
+    It returns the pyarrow Table of a block of the data. Columns in seconds are dates written
+    without fractions of second, as in '2014-01-01 00:00:00'.
+    """
+    arrays = {}
+    for name, values in df.items():
+        if name in seconds:
+            values = values.to_numpy().astype('datetime64[s]')
+        elif float_decimals is not None and values.dtype.kind == 'f':
+            values = np.round(values.to_numpy(), float_decimals)
+        arrays[str(name)] = pa.array(values, from_pandas=True)
+    return pa.table(arrays)
+
+
+def to_csv(self, path=None, compression='infer', chunk_rows=100000, float_format=None):
     """
     Create a CSV file with the WaterFrame data.
     The metadata and vocabulary will be placed in the first lines of the file with a # as first
-    character of the line.
+    character of the line, followed by the index levels and the dtypes of the data and the keys
+    of the metadata and vocabulary values that are not str, which are used by mooda.read_csv()
+    to get the WaterFrame back. The data is written with pyarrow in
+    blocks of rows.
 
     Parameters
     ----------
@@ -13,31 +99,56 @@ def to_csv(self, path=None):
             Location and filename of the csv file.
             If path is None, the filename will be the
             metadata['id'].
-    
+        compression: str, optional (compression = 'infer')
+            Compression codec: 'gzip', 'bz2', 'zstd', 'lz4', 'brotli' or None. If it is
+            'infer', the codec is detected from the extension of path (.gz, .bz2, .zst, .lz4
+            or .br).
+        chunk_rows: int, optional (chunk_rows = 100000)
+            Number of rows converted and written at a time.
+        float_format: int or str, optional (float_format = None)
+            Number of decimals of the float values, as 3 or '%.3f'. If it is None, float values
+            are written with the shortest representation that keeps all their precision.
+
     Returns
     -------
         path: str
             Location and filename of the csv file.
     """
-
     filename = path
     if path is None:
         filename = self.metadata['id'] + '.csv'
+        if compression not in [None, 'infer']:
+            filename += EXTENSIONS.get(compression, '')
+    if compression == 'infer':
+        compression = 'detect'
+
+    float_decimals = decimals(float_format)
+    keys = index_keys(self.data.index)
+
+    # Names of the columns
+    names = io.StringIO()
+    csv.writer(names, lineterminator='\n').writerow(
+        keys + [str(column) for column in self.data.columns])
+
+    seconds = [key for position, key in enumerate(keys)
+               if whole_seconds(self.data.index.get_level_values(position))]
+    seconds += [column for column, values in self.data.items() if whole_seconds(values)]
+
+    with pa.output_stream(filename, compression=compression) as stream:
+        stream.write((csv_header(self, keys) + names.getvalue()).encode('utf-8'))
 
-    with open(filename, 'w') as f:
-        f.write('# METADATA\n')
-        for key, value in self.metadata.items():
-            if value != '':
-               f.write(f'# {key}: {value}\n')
-        f.write('\n')
-        f.write('# VOCABULARY\n')
-        for key, definition in self.vocabulary.items():
-            f.write(f'# {key}:\n')
-            for key_definition, value_definition in definition.items():
-               f.write(f'#   - {key_definition}: {value_definition}\n')
-        f.write('\n')
-
-    # Save data in a csv
-    self.data.to_csv(filename, mode='a')
+        write_options = pa_csv.WriteOptions(include_header=False, quoting_style='needed')
+        writer = None
+        for start in range(0, len(self.data), chunk_rows):
+            block = self.data.iloc[start:start + chunk_rows]
+            block = block.reset_index() if keys else block
+            table = csv_table(block, float_decimals, seconds)
+            if writer is None:
+                # All the blocks are written with the types of the first one
+                schema = table.schema
+                writer = pa_csv.CSVWriter(stream, schema, write_options=write_options)
+            writer.write_table(table.cast(schema))
+        if writer is not None:
+            writer.close()
 
     return filename
@@ -1,13 +1,164 @@
 import json
-from elasticsearch import Elasticsearch, exceptions
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
+from elasticsearch import Elasticsearch, exceptions, helpers
+from ...cache import CACHE_DIR
+from ._documents import data_documents
+
+
+def send_chunk(es, chunk, max_retries=3, initial_backoff=2, max_backoff=600):
+    """
+    It sends a chunk of documents (see data_documents()) in one bulk request. Documents
+    rejected because ElasticSearch is busy (429), and the whole chunk if the connection fails,
+    are sent again after waiting initial_backoff * 2**retry seconds (up to max_backoff). Since
+    the documents have deterministic ids, sending them again does not duplicate them.
+
+    Returns
+    -------
+        size: int
+            Number of documents of the chunk.
+    """
+    documents = list(chunk)
+    size = len(documents)
+    for retry in range(max_retries + 1):
+        try:
+            response = es.bulk(body=''.join(documents).encode('utf-8'))
+        except (exceptions.ConnectionError, exceptions.ConnectionTimeout):
+            if retry == max_retries:
+                raise
+            sleep(min(max_backoff, initial_backoff * 2 ** retry))
+            continue
+        if not response['errors']:
+            return size
+
+        busy = []
+        errors = []
+        for document, item in zip(documents, response['items']):
+            op_type, result = next(iter(item.items()))
+            status = result.get('status', 500)
+            if status == 429:
+                busy.append(document)
+                errors.append({op_type: result})
+            elif not 200 <= status < 300:
+                errors.append({op_type: result})
+        if len(errors) > len(busy) or retry == max_retries:
+            raise helpers.BulkIndexError(f'{len(errors)} document(s) failed to index.', errors)
+        documents = busy
+        sleep(min(max_backoff, initial_backoff * 2 ** retry))
+
+
+def bulk_ingestion(es, chunks, thread_count=4, max_retries=3, initial_backoff=2,
+                   max_backoff=600):
+    """
+    It sends the chunks of documents to ElasticSearch, with up to thread_count chunks sent at
+    the same time.
+
+    Parameters
+    ----------
+        es: elasticsearch.Elasticsearch
+        chunks: iterable
+            Chunks of documents, from data_documents().
+        thread_count: int
+            Number of threads sending chunks.
+        max_retries, initial_backoff, max_backoff:
+            Retries of each chunk (see send_chunk()).
+
+    Yields
+    ------
+        size: int
+            Number of documents of each chunk, in the order of the chunks, once ElasticSearch
+            has acknowledged it.
+    """
+    if thread_count <= 1:
+        for chunk in chunks:
+            yield send_chunk(es, chunk, max_retries, initial_backoff, max_backoff)
+        return
+
+    with ThreadPoolExecutor(max_workers=thread_count) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(
+                send_chunk, es, chunk, max_retries, initial_backoff, max_backoff))
+            # Do not build more chunks than the ones that are being sent
+            if len(pending) >= 2 * thread_count:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def refresh_interval(es, index_name, value=None):
+    """
+    It sets the refresh_interval of an index and returns the previous one. If the index does
+    not exist yet, it is created with the refresh_interval and the previous one is None. A
+    value of None restores the default refresh_interval of ElasticSearch.
+    """
+    if not es.indices.exists(index=index_name):
+        es.indices.create(index=index_name,
+                          body={'settings': {'index': {'refresh_interval': value}}})
+        return None
+    response = es.indices.get_settings(index=index_name, name='index.refresh_interval',
+                                       include_defaults=True)
+    previous = None
+    for index_settings in dict(response).values():
+        for section in ['defaults', 'settings']:
+            previous = index_settings.get(section, {}).get('index', {}).get(
+                'refresh_interval', previous)
+    es.indices.put_settings(index=index_name, body={'index': {'refresh_interval': value}})
+    return previous
+
+
+def checkpoint_path(metadata_id, checkpoint_dir=None):
+    """
+    Path of the checkpoint file of the ingestion of a WaterFrame.
+
+    Parameters
+    ----------
+        metadata_id: str
+            WaterFrame.metadata['id']
+        checkpoint_dir: str
+            Folder of the checkpoint files. If it is None, CACHE_DIR/to_es.
+
+    Returns
+    -------
+        path: str
+    """
+    if checkpoint_dir is None:
+        checkpoint_dir = os.path.join(CACHE_DIR, 'to_es')
+    return os.path.join(checkpoint_dir, str(metadata_id).replace(os.sep, '_') + '.json')
+
+
+def read_checkpoint(path):
+    """
+    It returns the checkpoint {'index/parameter/QC': {'chunk', 'records'}} saved in path, or an
+    empty checkpoint if the file does not exist.
+    """
+    try:
+        with open(path) as checkpoint_file:
+            return json.load(checkpoint_file)
+    except FileNotFoundError:
+        return {}
+
+
+def write_checkpoint(path, checkpoint):
+    """
+    Save the checkpoint into path. The file is replaced atomically, so it is never left half
+    written if the process is killed.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file)
+    os.replace(tmp_path, path)
 
 
 def to_es(self, data_index_name='data', metadata_index_name='metadata',
           summary_index_name='summary', vocabulary_index_name='vocabulary',
           qc_to_ingest=[0, 1], parameters=None, metadata_to_es=True,
           data_to_es=True, summary_to_es=True, vocabulary_to_es=True, start=None,
-          **kwargs):
+          chunk_size=500, thread_count=4, max_retries=3, initial_backoff=2, max_backoff=600,
+          resume=False, checkpoint_dir=None, **kwargs):
     """
     Injestion of the WaterFrame into a ElasticSeach DB.
 
@@ -31,46 +182,30 @@ def to_es(self, data_index_name='data', metadata_index_name='metadata',
             If True, data will be ingested.
         vocabulary_to_es: bool
             If True, vocabulary will be ingested.
+        start: int
+            Number of records of each parameter and QC flag to skip.
+        chunk_size: int
+            Number of documents of each bulk request.
+        thread_count: int
+            Number of threads sending bulk requests at the same time.
+        max_retries: int
+            Number of retries of a bulk request, when ElasticSearch is busy or the connection
+            fails.
+        initial_backoff: float
+            Seconds to wait before the first retry. It is doubled in every retry.
+        max_backoff: float
+            Maximum number of seconds to wait between retries.
+        resume: bool
+            If True, the ingestion of the data continues after the last bulk request
+            acknowledged by ElasticSearch in a previous call that did not finish. The progress
+            of each parameter and QC flag is saved in a checkpoint file after each bulk
+            request, and the file is deleted when all the data is ingested.
+        checkpoint_dir: str
+            Folder of the checkpoint files. If it is None, ~/.cache/mooda/to_es (see
+            mooda.cache.CACHE_DIR).
         **kwargs: Elasticsearch object creation arguments.
             See https://elasticsearch-py.readthedocs.io/en/master/index.html#
     """
-    def data_ingestion(es, data_index_name, list_data_dict, start_in):
-
-        bulk_size = len(list_data_dict)
-        try:
-            print(list_data_dict[1]['parameter'], "to ingest:", bulk_size, "records")
-        except IndexError:
-            pass
-        while bulk_size >= 100:
-            if start_in:
-                if bulk_size <= start_in:
-                    try:
-                        es.bulk(index=data_index_name, body=list_data_dict[:100], refresh=True)
-                    except ValueError:
-                        # Empty body
-                        pass
-                    list_data_dict = list_data_dict[100:]
-                    bulk_size -= 100
-                else:
-                    list_data_dict = list_data_dict[start_in:]
-                    bulk_size = start_in
-            else:
-                try:
-                    es.bulk(index=data_index_name, body=list_data_dict[:100], refresh=True)
-                except ValueError:
-                    # Empty body
-                    pass
-                list_data_dict = list_data_dict[100:]
-                bulk_size -= 100
-            try:
-                print(list_data_dict[1]['parameter'], "to ingest:", bulk_size, "records")
-            except IndexError:
-                pass
-        if bulk_size > 0:
-            es.bulk(index=data_index_name, body=list_data_dict, refresh=True)
-
-        return True
-
     def summary_ingestion(es, summary_index_name, summary_dict):
 
         try:
@@ -209,80 +344,62 @@ def to_es(self, data_index_name='data', metadata_index_name='metadata',
         if parameters is None:
             parameters = self.parameters
 
-        for parameter in self.parameters:
+        path = checkpoint_path(self.metadata['id'], checkpoint_dir)
+        checkpoint = read_checkpoint(path) if resume else {}
 
-            print(f'Parameter to ingest: {parameter}')
-            print(f'Total parameters [{self.parameters}]')
-            # Only upload the input parameters
-            if parameter not in parameters:
-                continue
+        # Refresh the index once, at the end of the ingestion. A new index is created before
+        # the first bulk request, so it is not refreshed during the ingestion either.
+        previous_refresh_interval = refresh_interval(es, data_index_name, '-1')
+        try:
+            for parameter in self.parameters:
+                # Only upload the input parameters
+                if parameter not in parameters:
+                    continue
 
-            mini_wf = self.copy()
-            try:
-                mini_wf.data = self.data[[parameter, parameter+'_QC', 'DEPH', 'DEPH_QC', 'TIME_QC']]
-            except KeyError:
-                mini_wf.data = self.data[[parameter, parameter+'_QC', 'TIME_QC']].copy()
-                mini_wf.data['DEPH'] = mini_wf.data.index.get_level_values('DEPTH')
-                if 'DEPTH_QC' in self.data.keys():
-                    mini_wf.data['DEPH_QC'] = self.data['DEPTH_QC']
-                else:
-                    mini_wf.data['DEPH_QC'] = 0
-
-            mini_wf.data = mini_wf.data.dropna()
-
-            mini_wf.data.reset_index(inplace=True)
-            mini_wf.data.set_index('TIME', inplace=True)
-
-            df_init = mini_wf.data
-
-            for qc_value in qc_to_ingest:
-                df = df_init[df_init[parameter+'_QC'] == qc_value]
-
-                list_data_dict = []
-                for index, row in df.iterrows():
-
-                    index_dict = {
-                        'index': {
-                            # '_id': f"{self.metadata['id']}_{parameter}_{str(index)[:19].replace(' ', 'T')}_{str(row['DEPH'])}"
-                            '_id': f"{self.metadata['id']}_{parameter}_{str(index).replace(' ', 'T')}_{str(row['DEPH'])}"
-                        }
-                    }
-                    list_data_dict.append(index_dict)
-
-                    data_dict = {
-                        'parameter': parameter,
-                        'time': str(index)[:19],
-                        'time_qc': int(row['TIME_QC']),
-                        'depth': str(row['DEPH']),
-                        'depth_qc': int(row['DEPH_QC']),
-                        'value': str(row[parameter]),
-                        'value_qc': int(row[parameter+'_QC']),
-                        'metadata_id': self.metadata['id'],
-                        'platform_code': self.metadata['platform_code'],
-                        'institution': self.metadata['institution'],
-                        'area': self.metadata['area'],
-                        'long_name': self.vocabulary[parameter]['long_name'],
-                        'units': self.vocabulary[parameter]['units'],
-                        'location': {
-                            'lat': self.metadata['last_latitude_observation'],
-                            'lon': self.metadata['last_longitude_observation'],
-                        },
-                        'location_qc': 0,
-                    }
-                    list_data_dict.append(data_dict)
-
-                if list_data_dict:
-                    ok = data_ingestion(es, data_index_name, list_data_dict, start)
-                    if ok:
-                        print(f"Data from {parameter} with QC {qc_value} ingested")
+                try:
+                    df_init = self.data[[parameter, parameter+'_QC', 'DEPH', 'DEPH_QC', 'TIME_QC']]
+                except KeyError:
+                    df_init = self.data[[parameter, parameter+'_QC', 'TIME_QC']].copy()
+                    df_init['DEPH'] = df_init.index.get_level_values('DEPTH')
+                    if 'DEPTH_QC' in self.data.keys():
+                        df_init['DEPH_QC'] = self.data['DEPTH_QC']
                     else:
-                        print(f"ERROR in ingestion of data from {parameter}")
-
-                    # Wait for ES operations
-                    sleep(0.01)
-
-            print(f'Parameter ingested: {parameter}')
-            print(f'Total parameters [{self.parameters}]')
+                        df_init['DEPH_QC'] = 0
+
+                df_init = df_init.dropna().reset_index().set_index('TIME')
+
+                for qc_value in qc_to_ingest:
+                    df = df_init[df_init[parameter+'_QC'] == qc_value]
+                    if start:
+                        df = df.iloc[start:]
+
+                    # Records acknowledged in a previous call
+                    key = f'{data_index_name}/{parameter}/{qc_value}'
+                    progress = checkpoint.setdefault(key, {'chunk': 0, 'records': 0})
+                    df = df.iloc[progress['records']:]
+                    if df.empty:
+                        continue
+
+                    chunks = data_documents(df, parameter, self.metadata, self.vocabulary,
+                                            data_index_name, chunk_size=chunk_size)
+                    ingested = 0
+                    for size in bulk_ingestion(
+                            es, chunks, thread_count=thread_count,
+                            max_retries=max_retries, initial_backoff=initial_backoff,
+                            max_backoff=max_backoff):
+                        ingested += size
+                        progress['chunk'] += 1
+                        progress['records'] += size
+                        write_checkpoint(path, checkpoint)
+                    print(f"Data from {parameter} with QC {qc_value} ingested: "
+                          f"{ingested} records")
+        finally:
+            refresh_interval(es, data_index_name, previous_refresh_interval)
+        es.indices.refresh(index=data_index_name)
+
+        # All the data is ingested
+        if os.path.exists(path):
+            os.remove(path)
 
     if vocabulary_to_es:
         for key, value in self.vocabulary.items():
@@ -2,22 +2,40 @@
 Function to be imported in a WaterFrame. It creates a JSON with the WaterFrame information.
 """
 import json
+from ._documents import record_blocks
 
 
-def to_json(self):
+def to_json(self, orient='columns'):
     """
     Get a JSON with the WaterFrame information.
 
+    Parameters
+    ----------
+        orient: str, optional (orient = 'columns')
+            Layout of the data, which is saved as a JSON string.
+            'columns': JSON of WaterFrame.data.to_json().
+            'records': JSON array with an object for each row, with the index levels and the
+            columns of the row. The objects are built column by column (see
+            mooda.waterframe.output._documents), so it is faster for big WaterFrames.
+
     Returns
     -------
         json_string: str
             JSON string.
     """
+    if orient == 'columns':
+        data_string = self.data.to_json()
+    elif orient == 'records':
+        data_string = '[' + ','.join(
+            ','.join(records) for records in record_blocks(self.data) if len(records)) + ']'
+    else:
+        raise ValueError("orient must be 'columns' or 'records'.")
+
     # Convert all dict values into str
     big_dict = {
         "metadata": dict(zip(self.metadata, map(str, self.metadata.values()))),
         "vocabulary": dict(zip(self.vocabulary, map(str, self.vocabulary.values()))),
-        "data": self.data.to_json()
+        "data": data_string
     }
 
     json_string = json.dumps(big_dict)
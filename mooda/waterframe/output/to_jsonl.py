@@ -0,0 +1,68 @@
+""" Implementation of WaterFrame.to_jsonl(path_or_buf=None, chunk_rows=100000) """
+import io
+import json
+from ...util.json_default import json_default
+from ._documents import index_keys, record_blocks
+
+
+def jsonl_header(wf):
+    """
+    It returns the first line of a JSON Lines file of a WaterFrame, with the metadata, the
+    vocabulary, the keys of the index levels and the dtypes of the index levels and the
+    columns.
+    """
+    index = wf.data.index
+    keys = index_keys(index)
+    dtypes = {key: str(index.get_level_values(position).dtype)
+              for position, key in enumerate(keys)}
+    dtypes.update({str(column): str(dtype) for column, dtype in wf.data.dtypes.items()})
+    header = {
+        'metadata': wf.metadata,
+        'vocabulary': wf.vocabulary,
+        'index': keys,
+        'index_names': list(index.names) if keys else [],
+        'dtypes': dtypes,
+    }
+    return json.dumps(header, default=json_default)
+
+
+def to_jsonl(self, path_or_buf=None, chunk_rows=100000):
+    """
+    Save the WaterFrame into a JSON Lines (NDJSON) file. The first line has the metadata, the
+    vocabulary, the index levels and the dtypes of the data. The next lines have a JSON object
+    for each row of the data, with the index levels and the columns of the row. The rows are
+    serialized and written in blocks, so the whole document is never in memory.
+
+    Parameters
+    ----------
+        path_or_buf: str or file object, optional (path_or_buf = None)
+            Location of the file, or a file object (text or binary) where the lines are
+            written. If path_or_buf is None, the path will be the metadata['id'] + '.jsonl'.
+        chunk_rows: int, optional (chunk_rows = 100000)
+            Number of rows serialized and written at a time.
+
+    Returns
+    -------
+        path_or_buf: str or file object
+            Location of the file or the input file object.
+    """
+    if path_or_buf is None:
+        path_or_buf = self.metadata['id'] + '.jsonl'
+
+    def write_lines(buf):
+        binary = not isinstance(buf, io.TextIOBase)
+
+        def write(text):
+            buf.write(text.encode('utf-8') if binary else text)
+
+        write(jsonl_header(self) + '\n')
+        for records in record_blocks(self.data, chunk_rows):
+            write('\n'.join(records) + '\n')
+
+    if hasattr(path_or_buf, 'write'):
+        write_lines(path_or_buf)
+    else:
+        with open(path_or_buf, 'w', encoding='utf-8') as jsonl_file:
+            write_lines(jsonl_file)
+
+    return path_or_buf
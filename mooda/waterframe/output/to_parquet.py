@@ -0,0 +1,40 @@
+""" Implementation of WaterFrame.to_parquet(path) """
+import json
+import pyarrow as pa
+import pyarrow.parquet as pq
+from ...util.json_default import json_default
+
+
+def to_parquet(self, path=None, compression='snappy', row_group_size=None):
+    """
+    Save the WaterFrame into a Parquet file.
+    The data is saved column by column with its index (DEPTH, TIME), and the metadata and the
+    vocabulary are saved as JSON in the key-value metadata of the file.
+
+    Parameters
+    ----------
+        path: str
+            Location of the Parquet file. If path is None, the path will be the metadata['id'].
+        compression: str, optional (compression = 'snappy')
+            Compression codec: 'snappy', 'gzip', 'brotli', 'lz4', 'zstd' or None.
+        row_group_size: int, optional (row_group_size = None)
+            Maximum number of rows of each row group. Smaller row groups allow reading smaller
+            time intervals with mooda.read_parquet(). If it is None, pyarrow decides it.
+
+    Returns
+    -------
+        path: str
+            Location of the Parquet file.
+    """
+    if path is None:
+        path = self.metadata['id'] + '.parquet'
+
+    table = pa.Table.from_pandas(self.data, preserve_index=True)
+    file_metadata = dict(table.schema.metadata or {})
+    file_metadata[b'mooda_metadata'] = json.dumps(self.metadata, default=json_default)
+    file_metadata[b'mooda_vocabulary'] = json.dumps(self.vocabulary, default=json_default)
+    table = table.replace_schema_metadata(file_metadata)
+
+    pq.write_table(table, path, compression=compression, row_group_size=row_group_size)
+
+    return path
@@ -19,5 +19,8 @@ def to_pkl(self, path_pkl=None):
     if path_pkl is None:
         path_pkl = self.metadata['id'] + '.pkl'
 
-    pickle.dump(self.__dict__, open(path_pkl, "wb"))
+    # Rows appended by qc_incremental() are concatenated before the data is saved
+    state = dict(self.__dict__, data=self.data)
+    state.pop('_pending_rows', None)
+    pickle.dump(state, open(path_pkl, "wb"))
     return path_pkl
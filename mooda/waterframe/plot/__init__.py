@@ -1,4 +1,8 @@
-from .plot_timeseries import plot_timeseries
-from .plot_timebar import plot_timebar
-from .plot_hist import plot_hist
-from .plot import plot
+from ..._lazy import lazy_package
+
+lazy_package(__name__, {
+    'plot_timeseries': ('.plot_timeseries', 'plot_timeseries'),
+    'plot_timebar': ('.plot_timebar', 'plot_timebar'),
+    'plot_hist': ('.plot_hist', 'plot_hist'),
+    'plot': ('.plot', 'plot'),
+})
@@ -1,5 +1,13 @@
-from .qc_flat_test import qc_flat_test
-from .qc_spike_test import qc_spike_test
-from .qc_range_test import qc_range_test
-from .qc_replace import qc_replace
-from .qc_syntax_test import qc_syntax_test
+from ..._lazy import lazy_package
+
+lazy_package(__name__, {
+    'qc_flat_test': ('.qc_flat_test', 'qc_flat_test'),
+    'qc_range_test': ('.qc_range_test', 'qc_range_test'),
+    'qc_spike_test': ('.qc_spike_test', 'qc_spike_test'),
+    'qc_replace': ('.qc_replace', 'qc_replace'),
+    'qc_syntax_test': ('.qc_syntax_test', 'qc_syntax_test'),
+    'qc_pipeline': ('.qc_pipeline', 'qc_pipeline'),
+    'qc_multiparameter_test': ('.qc_multiparameter_test', 'qc_multiparameter_test'),
+    'qc_incremental': ('.qc_incremental', 'qc_incremental'),
+    'QCState': ('.qc_incremental', 'QCState'),
+})
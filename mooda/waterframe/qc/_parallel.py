@@ -0,0 +1,100 @@
+""" Helpers to run the QC tests over the (parameter, depth) series of a WaterFrame """
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+
+def depth_groups(data):
+    """
+    It returns the positions of the rows of each DEPTH of data, sorted by TIME.
+
+    Parameters
+    ----------
+        data: pandas.DataFrame
+            WaterFrame.data
+
+    Returns
+    -------
+        groups: list of numpy.array
+            Positions (int) of the rows of each DEPTH. If data does not have a DEPTH index, there
+            is only one group.
+    """
+    index = data.index
+    if 'TIME' in index.names:
+        time = np.asarray(index.get_level_values('TIME'))
+    else:
+        time = np.arange(len(data))
+
+    if 'DEPTH' not in index.names:
+        return [np.argsort(time, kind='stable')]
+
+    codes, _ = pd.factorize(index.get_level_values('DEPTH'), sort=True)
+    order = np.lexsort((time, codes))
+    # Rows without DEPTH (code -1) are not tested, like in DataFrame.groupby()
+    order = order[codes[order] >= 0]
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    return np.split(order, bounds)
+
+
+def time_values(data):
+    """
+    It returns the TIME of each row of data as nanoseconds (int64), to compare times of the
+    series of depth_groups() without pandas objects.
+
+    Parameters
+    ----------
+        data: pandas.DataFrame
+            WaterFrame.data
+
+    Returns
+    -------
+        time: numpy.array of int64
+    """
+    if 'TIME' not in data.index.names:
+        raise KeyError('TIME must be an index of WaterFrame.data to use a time window.')
+    time = np.asarray(data.index.get_level_values('TIME'), dtype='datetime64[ns]')
+    return time.view(np.int64)
+
+
+def run_tasks(function, tasks, n_jobs=1, backend='process'):
+    """
+    It calls function(*task) for each task and returns the results in the same order.
+
+    Parameters
+    ----------
+        function: callable
+            Function to call. With the 'process' backend, it must be a module level function.
+        tasks: iterable of tuples
+            Arguments of each call. When tasks run one by one, they are consumed lazily.
+        n_jobs: int or None
+            Number of workers. If it is None or 1, tasks run one by one in the current process.
+            If it is -1, it uses all the CPUs.
+        backend: str
+            'process' to use a pool of processes (for pure Python kernels) or 'thread' to use a
+            pool of threads (for numpy kernels, that release the GIL).
+
+    Returns
+    -------
+        results: list
+    """
+    if n_jobs is None or n_jobs == 1:
+        return [function(*task) for task in tasks]
+
+    tasks = list(tasks)
+    if len(tasks) < 2:
+        return [function(*task) for task in tasks]
+
+    if n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(tasks))
+
+    if backend == 'process':
+        chunksize = max(1, len(tasks) // (n_jobs * 4))
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            return list(executor.map(function, *zip(*tasks), chunksize=chunksize))
+    elif backend == 'thread':
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            return list(executor.map(function, *zip(*tasks)))
+    else:
+        raise ValueError(f"backend must be 'process' or 'thread', not '{backend}'")
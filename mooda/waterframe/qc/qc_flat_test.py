@@ -1,23 +1,109 @@
 """ Implementation of WaterFrame.qc_flat_test(parameters=None, window=2, flag=4) """
+import datetime
+import numpy as np
+import pandas as pd
+from ._parallel import depth_groups, run_tasks, time_values
+from ..analysis.copy import copy_data
 
 
-def qc_flat_test(self, parameters=None, window=3, flag=4, inplace=True):
+def time_window(window):
+    """
+    It returns the window in nanoseconds if it is a time window (Ex: '10min'), or None if it is
+    a number of values.
+    """
+    if isinstance(window, (str, datetime.timedelta, np.timedelta64)):
+        return pd.Timedelta(window).value
+    return None
+
+
+def run_starts(values):
+    """
+    It returns the position where the run of equal consecutive values of each value starts.
+    Missing values (NaN) are not part of any run.
+
+    Returns
+    -------
+        (starts, valid): (numpy.array of int, numpy.array of bool)
+            Start of the run of each value, and positions that are not NaN.
+    """
+    values = np.asarray(values)
+    positions = np.arange(len(values))
+    valid = ~pd.isna(values)
+    new_run = ~valid
+    if len(values):
+        new_run[0] = True
+        new_run[1:] |= values[1:] != values[:-1]
+        # A value after a NaN starts a new run
+        new_run[1:] |= ~valid[:-1]
+    starts = np.maximum.accumulate(np.where(new_run, positions, 0))
+    return starts, valid
+
+
+def flat_mask(values, window, times=None):
+    """
+    It returns True where all the values of the moving window are equal. The window ends on
+    each value and it must have at least two values.
+
+    Parameters
+    ----------
+        values: numpy.array
+            Values of one series, sorted by time.
+        window: int or str
+            Number of values of the window, or duration of the window (Ex: '10min').
+        times: numpy.array of int64, optional (times = None)
+            TIME of the values in nanoseconds, from time_values(). It is only used with time
+            windows.
+
+    Returns
+    -------
+        mask: numpy.array of bool
+    """
+    starts, valid = run_starts(values)
+    positions = np.arange(len(starts))
+    duration = time_window(window)
+    if duration is None:
+        if window < 2:
+            # The values of a window of one value are not compared with other values
+            return np.zeros(len(starts), dtype=bool)
+        return valid & (positions - starts + 1 >= window)
+    # First value of the window (t - window, t] of each value
+    first = np.searchsorted(times, times - duration, side='right')
+    return valid & (starts <= first) & (positions - first >= 1)
+
+
+def flat_algo(values, window, signals, flag, times=None):
+    """
+    It writes flag on signals where all the values of the moving window are equal.
+    """
+    signals = signals.copy()
+    signals[flat_mask(values, window, times)] = flag
+    return signals
+
+
+def qc_flat_test(self, parameters=None, window=3, flag=4, inplace=True, n_jobs=1):
     """
     It detects if there are equal consecutive values in the time series.
+    The values of each depth are tested sorted by TIME.
 
     Parameters
     ----------
         parameters: string or list of strings, optional
         (parameters = None)
             Parameter to apply the test.
-        window: int, optional (window = 3)
-            Size of the moving window of values to calculate the mean.
+        window: int or str, optional (window = 3)
+            Size of the moving window of values to compare.
             If it is 0, the function calculates the optimal window.
+            It can be a duration (Ex: '10min') for series with irregular sampling: a value
+            fails if it is equal to all the values of the previous 10 minutes.
+            A missing value (NaN) ends the run of equal values.
         flag: int, optional (flag = 4)
             Flag value to write in on the fail test values.
         inplace: bool
             If True, it changes the flags in place and returns True.
             Otherwhise it returns an other WaterFrame.
+        n_jobs: int, optional (n_jobs = 1)
+            Number of threads used to test the series of each parameter and depth in
+            parallel. If it is -1, it uses all the CPUs.
 
     Returns
     -------
@@ -31,20 +117,35 @@ def qc_flat_test(self, parameters=None, window=3, flag=4, inplace=True):
     if window == 0:
         window = 2
 
-    df_rolling = self.data.rolling(window).std()
-
-    data = self.data.copy()
-
     for parameter in parameters:
         if '_QC' in parameter:
             return False
-        else:
-            data.loc[df_rolling[parameter] == 0, parameter + '_QC'] = flag
+
+    # Only the QC columns are replaced, so the columns of values can be shared
+    data = copy_data(self.data, shared=inplace)
+    groups = depth_groups(data)
+    times = time_values(data) if time_window(window) is not None else None
+
+    tasks = []
+    for parameter in parameters:
+        values = data[parameter].values
+        signals = data[parameter + '_QC'].values
+        for positions in groups:
+            tasks.append((values[positions], window, signals[positions], flag,
+                          None if times is None else times[positions]))
+
+    results = iter(run_tasks(flat_algo, tasks, n_jobs=n_jobs, backend='thread'))
+
+    for parameter in parameters:
+        signals = data[parameter + '_QC'].values.copy()
+        for positions in groups:
+            signals[positions] = next(results)
+        data[parameter + '_QC'] = signals
 
     if inplace:
         self.data = data
         return True
     else:
-        new_wf = self.copy()
+        new_wf = self.copy(deep=False)
         new_wf.data = data
         return new_wf
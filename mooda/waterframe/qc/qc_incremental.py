@@ -0,0 +1,213 @@
+""" Implementation of WaterFrame.qc_incremental(new_rows=None, tests=None) """
+import numpy as np
+import pandas as pd
+from ._parallel import depth_groups, time_values
+from ...util.qc_flags import compact_qc
+from .qc_flat_test import flat_mask, time_window
+from .qc_range_test import limits_table, range_step
+from .qc_replace import replace_flags, replacements
+from .qc_spike_test import spike_scan
+
+
+class QCState:
+    """
+    State of the incremental QC of a WaterFrame. It is saved in WaterFrame.qc_state, and it is
+    pickled with the WaterFrame by WaterFrame.to_pkl().
+
+    Attributes
+    ----------
+        tests: list of tuples
+            (name of the test, dictionary with the arguments of the test), as in
+            WaterFrame.qc_pipeline().
+        parameters: list of str
+            Tested parameters.
+        columns: list
+            Columns of WaterFrame.data.
+        series: dict
+            {(parameter, depth): list with the state of each test for the series}.
+        last_time: dict
+            {depth: TIME of the last row of the depth}.
+    """
+
+    def __init__(self, tests, parameters, columns):
+        self.tests = []
+        for test in tests:
+            if isinstance(test, str):
+                name, options = test, {}
+            else:
+                name, options = test[0], dict(test[1])
+            if name == 'flat':
+                options.setdefault('window', 3)
+                if options['window'] == 0:
+                    options['window'] = 2
+            elif name == 'spike':
+                # The automatic window depends on the number of rows, which grows with each call
+                if not options.get('window'):
+                    raise ValueError('The spike test of qc_incremental() needs a window.')
+            elif name not in ['range', 'replace']:
+                raise ValueError(
+                    f"Unknown test '{name}'. Tests must be 'flat', 'range', 'spike' or 'replace'.")
+            self.tests.append((name, options))
+        self.parameters = list(parameters)
+        self.columns = list(columns)
+        self.series = {}
+        self.last_time = {}
+
+    def __repr__(self):
+        names = [name for name, _ in self.tests]
+        return f'QCState(tests={names}, parameters={self.parameters}, series={len(self.series)})'
+
+    def copy(self):
+        """
+        It returns a copy of the state that can be updated without changing this one.
+        """
+        new_state = QCState.__new__(QCState)
+        new_state.tests = self.tests
+        new_state.parameters = self.parameters
+        new_state.columns = self.columns
+        new_state.series = dict(self.series)
+        new_state.last_time = dict(self.last_time)
+        return new_state
+
+
+def flat_step(values, times, state, window):
+    """
+    Flat test of the next values of a series. The state keeps the last values of the series
+    that can be in the window of the next values.
+
+    Returns
+    -------
+        (mask, state): (numpy.array of bool, dict)
+    """
+    duration = time_window(window)
+    if state is None:
+        state = {'values': values[:0], 'times': None if times is None else times[:0]}
+    all_values = np.concatenate([state['values'], values])
+    all_times = None if duration is None else np.concatenate([state['times'], times])
+    mask = flat_mask(all_values, window, all_times)[len(state['values']):]
+
+    if duration is None:
+        keep = max(int(np.ceil(window)) - 1, 0)
+        start = len(all_values) - keep
+    else:
+        start = np.searchsorted(all_times, all_times[-1] - duration, side='right')
+    state = {'values': all_values[start:],
+             'times': None if all_times is None else all_times[start:]}
+    return mask, state
+
+
+def qc_incremental(self, new_rows=None, tests=None):
+    """
+    Incremental QC for near-real-time data. The first call tests all the rows of the WaterFrame
+    and saves the state of the tests in WaterFrame.qc_state. The next calls append new_rows to
+    WaterFrame.data and only test the new rows, continuing the tests of each depth from the
+    saved state. The flags are the same as the flags of wf.qc_pipeline(tests) with all the rows.
+    New rows of each depth must be later than the rows of the same depth already tested.
+
+    Parameters
+    ----------
+        new_rows: pandas.DataFrame or WaterFrame, optional (new_rows = None)
+            Rows to append, with the same index and columns as WaterFrame.data.
+        tests: list, optional (tests = None)
+            Tests to apply, in order, as in WaterFrame.qc_pipeline(). The spike test always
+            uses the 'running' engine, and it needs a window (the automatic window of
+            qc_pipeline() changes with the number of rows). Tests are only used in the first
+            call, to create the state; the next calls use the tests of WaterFrame.qc_state.
+
+    Returns
+    -------
+        success: bool
+    """
+    state = getattr(self, 'qc_state', None)
+    first_call = state is None
+    # The columns of the state, so the rows appended in other calls are not concatenated
+    columns = getattr(state, 'columns', None)
+    if columns is None:
+        columns = self.data.columns
+    if new_rows is not None:
+        new_data = getattr(new_rows, 'data', new_rows)
+        if set(new_data.columns) != set(columns):
+            raise ValueError('The columns of new_rows must be the columns of WaterFrame.data.')
+        new_data = new_data[columns]
+
+    if first_call:
+        if tests is None:
+            raise ValueError('tests are required to create the state of the incremental QC.')
+        if new_rows is None:
+            data = self.data.copy()
+        else:
+            data = pd.concat([self.data, new_data])
+        state = QCState(tests, self.parameters, data.columns)
+    elif new_rows is None or len(new_data) == 0:
+        return True
+    else:
+        data = compact_qc(new_data.copy())
+        state = state.copy()
+
+    index = data.index
+    groups = depth_groups(data)
+    if 'DEPTH' in index.names:
+        depth_values = index.get_level_values('DEPTH')
+        depths = [float(depth_values[positions[0]]) for positions in groups]
+    else:
+        depths = [None for _ in groups]
+    time_tests = any(name == 'flat' and time_window(options['window']) is not None
+                     for name, options in state.tests)
+    times = time_values(data) if 'TIME' in index.names or time_tests else None
+
+    # The new rows must continue the series
+    if times is not None:
+        for depth, positions in zip(depths, groups):
+            if depth in state.last_time and times[positions[0]] < state.last_time[depth]:
+                raise ValueError(f'The new rows of DEPTH {depth} are older than the tested rows.')
+            state.last_time[depth] = times[positions[-1]]
+
+    # Rows of the series. Rows without DEPTH are not tested, like in qc_pipeline()
+    tested = np.zeros(len(data), dtype=bool)
+    for positions in groups:
+        tested[positions] = True
+
+    for parameter in state.parameters:
+        values = data[parameter].values
+        signals = data[f'{parameter}_QC'].to_numpy(copy=True)
+        series = [state.series.get((parameter, depth), [None] * len(state.tests))
+                  for depth in depths]
+        series = [list(steps) for steps in series]
+
+        for step, (name, options) in enumerate(state.tests):
+            flag = options.get('flag', 4)
+            if name == 'range':
+                table = limits_table(options.get('limits'), [parameter])
+                mask = range_step(values, index, table) & tested
+                signals[mask] = flag
+                continue
+            for steps, positions in zip(series, groups):
+                if name == 'flat':
+                    mask, steps[step] = flat_step(
+                        values[positions], None if times is None else times[positions],
+                        steps[step], options['window'])
+                    signals[positions[mask]] = flag
+                elif name == 'spike':
+                    flagged, steps[step] = spike_scan(
+                        values[positions], options['window'], options.get('threshold', 3.5),
+                        options.get('influence', 0.5), steps[step])
+                    signals[positions[flagged]] = flag
+                elif name == 'replace':
+                    count = steps[step] or 0
+                    mask = np.arange(count, count + len(positions)) >= options.get('start', 0)
+                    pairs = replacements(options.get('to_replace', 0), options.get('value', 1))
+                    signals[positions] = replace_flags(signals[positions], pairs, mask)
+                    steps[step] = count + len(positions)
+
+        data[f'{parameter}_QC'] = signals
+        for depth, steps in zip(depths, series):
+            state.series[(parameter, depth)] = steps
+
+    if first_call:
+        self.data = data
+    else:
+        # The history is not copied in each call
+        self._append_rows(data)
+    self.qc_state = state
+
+    return True
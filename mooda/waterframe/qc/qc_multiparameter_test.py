@@ -1,3 +1,123 @@
-""" Implementation of WaterFrame.qc_multiparameter_test() """
+""" Implementation of WaterFrame.qc_multiparameter_test(rules, inplace=True) """
+import re
+import numpy as np
+import pandas as pd
+from ..analysis.copy import copy_data
 
-def qc_multiparameter_test()
\ No newline at end of file
+
+def propagation_rules(parameter, sources, flags=(0, 4)):
+    """
+    It returns the rules that copy the flags of the source parameters to a parameter.
+    The flags are applied in order, so the last one has priority: with flags=(0, 4), the
+    parameter is 4 if any source is 4, otherwise it is 0 if any source is 0.
+
+    Parameters
+    ----------
+        parameter: str
+            Parameter that receives the flags.
+        sources: list of str
+            Parameters used to calculate the values of parameter.
+        flags: list of int, optional (flags = (0, 4))
+            Flags to propagate.
+
+    Returns
+    -------
+        rules: list of tuples
+            Rules for qc_multiparameter_test().
+    """
+    return [(parameter, flag, ' or '.join(f'{source}_QC == {flag}' for source in sources))
+            for flag in flags]
+
+
+def compile_rules(rules, names):
+    """
+    It parses the rules and finds the columns and index levels that they use.
+
+    Parameters
+    ----------
+        rules: list of tuples or dicts
+            Rules of qc_multiparameter_test().
+        names: list of str
+            Columns and index levels of WaterFrame.data.
+
+    Returns
+    -------
+        (rules, used): (list of tuples, list of str)
+            Rules as (parameter, flag, condition) tuples, and names used by the conditions.
+    """
+    compiled = []
+    used = []
+    for rule in rules:
+        if isinstance(rule, dict):
+            rule = (rule['parameter'], rule['flag'], rule['condition'])
+        parameter, flag, condition = rule
+        for name in re.findall(r'[A-Za-z_]\w*', condition):
+            if name in names and name not in used:
+                used.append(name)
+        compiled.append((parameter, flag, condition))
+    return compiled, used
+
+
+def qc_multiparameter_test(self, rules, inplace=True):
+    """
+    It writes flags on the parameters that fail conditions that involve several parameters.
+    All the conditions are evaluated with the columns of values read once, and each QC column
+    is written once.
+
+    Parameters
+    ----------
+        rules: list of tuples or dicts
+            Each rule is a tuple (parameter, flag, condition) or a dictionary with the keys
+            'parameter', 'flag' and 'condition'. The flag is written on the QC of parameter
+            where the condition is True. The condition is an expression of pandas.eval() with
+            the names of the columns and the index levels of WaterFrame.data.
+            Rules are applied in order, so a rule replaces the flags of the previous rules of
+            the same parameter.
+            Ex: [('PSAL', 4, 'CNDC_QC == 4 or TEMP_QC == 4'),
+                 ('TEMP', 4, 'abs(TEMP - TEMP2) > 0.5')]
+        inplace: bool
+            If True, it changes the flags in place and returns True.
+            Otherwhise it returns an other WaterFrame.
+
+    Returns
+    -------
+        new_wf: WaterFrame
+    """
+    data = self.data
+    index = data.index
+    rules, used = compile_rules(rules, list(data.columns) + list(index.names))
+
+    # Values used by the conditions, read once
+    arrays = {}
+    for name in used:
+        if name in data.columns:
+            arrays[name] = data[name].values
+        else:
+            arrays[name] = index.get_level_values(name).values
+
+    # Conditions of each parameter, in the order of the rules
+    conditions = {}
+    for parameter, flag, condition in rules:
+        if f'{parameter}_QC' not in data.columns:
+            raise KeyError(f'{parameter}_QC is not a column of WaterFrame.data.')
+        mask = pd.eval(condition, local_dict=arrays)
+        mask = np.broadcast_to(np.asarray(mask, dtype=bool), (len(data),))
+        conditions.setdefault(parameter, []).append((mask, flag))
+
+    # Only the QC columns are replaced, so the columns of values can be shared
+    data = copy_data(data, shared=inplace)
+    for parameter, parameter_conditions in conditions.items():
+        signals = data[f'{parameter}_QC'].to_numpy(copy=True)
+        # The flags are written in the dtype of the QC column (uint8 with mooda.compact_qc),
+        # and the last rule has priority
+        for mask, flag in parameter_conditions:
+            signals[mask] = np.asarray(flag).astype(signals.dtype)
+        data[f'{parameter}_QC'] = signals
+
+    if inplace:
+        self.data = data
+        return True
+    else:
+        new_wf = self.copy(deep=False)
+        new_wf.data = data
+        return new_wf
@@ -0,0 +1,195 @@
+""" Implementation of WaterFrame.qc_pipeline(tests, parameters=None, inplace=True) """
+from functools import partial
+import numpy as np
+from ._parallel import depth_groups, run_tasks, time_values
+from .qc_flat_test import flat_algo, time_window
+from .qc_range_test import limits_table, range_algo, range_step
+from .qc_replace import change_signals
+from .qc_spike_test import auto_window, get_engine
+
+
+def replace_algo(values, signals, to_replace, value, start):
+    """
+    qc_replace() kernel with the same arguments as the kernels of the other tests.
+    """
+    return change_signals(signals, to_replace, value, start)
+
+
+def mask_algo(values, signals, mask, flag):
+    """
+    It writes flag on signals where mask is True. The mask of a range test with a table of
+    limits is calculated for all the rows before the series are tested.
+    """
+    signals = signals.copy()
+    signals[mask] = flag
+    return signals
+
+
+def parameter_values(data, parameter):
+    """
+    It returns the values of a parameter, that can be a column or an index of data.
+    """
+    if parameter in data.index.names:
+        return data.index.get_level_values(parameter).values
+    return data[parameter].values
+
+
+def uses_times(step):
+    """
+    It returns True if the step is a flat test with a time window.
+    """
+    return step.func is flat_algo and time_window(step.keywords['window']) is not None
+
+
+def apply_steps(values, signals, steps, times=None):
+    """
+    It applies the steps of the pipeline, one after the other, to the flags of one series.
+    """
+    for step in steps:
+        if uses_times(step):
+            signals = step(values, signals=signals, times=times)
+        else:
+            signals = step(values, signals=signals)
+    return signals
+
+
+def plan_steps(tests, parameter, length):
+    """
+    It returns the list of kernels (with their arguments) to apply to a parameter.
+
+    Parameters
+    ----------
+        tests: list
+            Tests of the pipeline (see qc_pipeline()).
+        parameter: str
+            Parameter to test.
+        length: int
+            Number of values of the parameter.
+
+    Returns
+    -------
+        steps: list of functools.partial
+    """
+    steps = []
+    for test in tests:
+        if isinstance(test, str):
+            name, options = test, {}
+        else:
+            name, options = test
+
+        if name == 'flat':
+            window = options.get('window', 3)
+            if window == 0:
+                window = 2
+            steps.append(partial(flat_algo, window=window, flag=options.get('flag', 4)))
+        elif name == 'range':
+            # Same limits as wf.qc_range_test(limits=...)
+            table = limits_table(options.get('limits'), [parameter])
+            flag = options.get('flag', 4)
+            if len(table) == 1 and table['depth'][0] == -np.inf and np.isnan(table['month'][0]):
+                steps.append(partial(range_algo, limits=(table['min'][0], table['max'][0]),
+                                     flag=flag))
+            elif not table.empty:
+                # Limits by depth band or month: the mask is calculated by qc_pipeline()
+                steps.append(partial(mask_algo, mask=table, flag=flag))
+        elif name == 'spike':
+            steps.append(partial(
+                get_engine(options.get('engine', 'running')),
+                lag=auto_window(options.get('window', 0), length),
+                threshold=options.get('threshold', 3.5),
+                influence=options.get('influence', 0.5),
+                flag=options.get('flag', 4)))
+        elif name == 'replace':
+            steps.append(partial(replace_algo,
+                                 to_replace=options.get('to_replace', 0),
+                                 value=options.get('value', 1),
+                                 start=options.get('start', 0)))
+        else:
+            raise ValueError(
+                f"Unknown test '{name}'. Tests must be 'flat', 'range', 'spike' or 'replace'.")
+    return steps
+
+
+def qc_pipeline(self, tests, parameters=None, inplace=True, n_jobs=1):
+    """
+    It applies several QC tests, one after the other, to the flags of the parameters.
+    The tests are planned once, and each series of values is read only once. Only the QC
+    columns of the tested parameters are written, without copies of WaterFrame.data.
+
+    Parameters
+    ----------
+        tests: list
+            Tests to apply, in order. Each test is a string with the name of the test or a tuple
+            (name of the test, dictionary with the arguments of the test). Tests:
+            'flat': wf.qc_flat_test() with arguments window (number of values or duration)
+            and flag.
+            'range': wf.qc_range_test() with arguments limits ((min value, max value),
+            dictionary {parameter: (min value, max value)} or table of limits) and flag.
+            'spike': wf.qc_spike_test() with arguments window, threshold, influence, flag and
+            engine.
+            'replace': wf.qc_replace() with arguments to_replace (a flag or a dictionary
+            {flag: new flag}), value and start.
+            Example: ['flat', ('range', {'limits': (0, 30)}), 'spike', ('replace', {'start': 10})]
+        parameters: string or list of strings, optional (parameters = None)
+            Parameters to test. If parameters is None, all parameters are tested.
+        inplace: bool
+            If True, it changes the flags in place and returns True.
+            Otherwhise it returns an other WaterFrame.
+        n_jobs: int, optional (n_jobs = 1)
+            Number of processes used to test the series of each parameter and depth in
+            parallel. If it is -1, it uses all the CPUs.
+
+    Returns
+    -------
+        new_wf: WaterFrame
+    """
+    if parameters is None:
+        parameters = self.parameters
+    elif isinstance(parameters, str):
+        parameters = [parameters]
+
+    if inplace:
+        data = self.data
+    else:
+        # The QC columns of the plan are replaced with new arrays, so the other columns can be
+        # shared with self.data
+        data = self.data.copy(deep=False)
+
+    groups = depth_groups(data)
+    length = len(data)
+
+    plan = [(parameter, plan_steps(tests, parameter, length)) for parameter in parameters]
+    for parameter, steps in plan:
+        for position, step in enumerate(steps):
+            if step.func is mask_algo:
+                mask = range_step(parameter_values(data, parameter), data.index, step.keywords['mask'])
+                steps[position] = partial(step, mask=mask)
+    if any(uses_times(step) for _, steps in plan for step in steps):
+        times = time_values(data)
+    else:
+        times = None
+
+    def tasks():
+        for parameter, steps in plan:
+            values = parameter_values(data, parameter)
+            signals = data[f'{parameter}_QC'].values
+            for positions in groups:
+                group_steps = [partial(step, mask=step.keywords['mask'][positions])
+                               if step.func is mask_algo else step for step in steps]
+                yield (values[positions], signals[positions], group_steps,
+                       None if times is None else times[positions])
+
+    results = iter(run_tasks(apply_steps, tasks(), n_jobs=n_jobs, backend='process'))
+
+    for parameter, _ in plan:
+        signals = data[f'{parameter}_QC'].values.copy()
+        for positions in groups:
+            signals[positions] = next(results)
+        data[f'{parameter}_QC'] = signals
+
+    if inplace:
+        return True
+    else:
+        new_wf = self.copy(deep=False)
+        new_wf.data = data
+        return new_wf
@@ -1,9 +1,247 @@
 """ Implementation of WaterFrame.qc_range_test(parameters=None, flag=4, limits=None) """
+import numpy as np
+import pandas as pd
+from ._parallel import run_tasks
+from ..analysis.copy import copy_data
 
+# Default (min value, max value) of each parameter
+RANGES = {
+    'ATMP': (600, 1500),  # atmospheric pressure at altitude
+    'ATMS': (0, 2000),  # Atmospheric pressure at sea level
+    'CHLT': (0, 30),  # total chlorophyll
+    'CNDC': (0, 30),  # electrical conductivity
+    'DRYT': (-20, 60),  # air temperature at sea level
+    'GSPD': (0, 40),  # gust wind speed
+    'HCDT': (0, 360),  # current to direction relative true north
+    'HEAD': (0, 360),  # PLAT. HEADING REL. TRUE NORTH
+    'LINC': (0, 3000),  # long-wave incoming radiation
+    'LW': (0, 50),  # Downwelling vector radiance as energy
+    'OSAT': (0, 200),  # oxygen saturation
+    'PHPH': (0, 14),  # ph
+    'PRES': (0, 500),  # sea pressure
+    'PRRT': (0, 200),  # hourly precipitation rate
+    'PSAL': (0, 40),  # practical salinity
+    'RDIN': (0, 1100),  # incident radiation
+    'SVEL': (130, 180000),  # sound velocity
+    'SWDR': (0, 360),  # SWELL DIRECTION REL TRUE N.
+    'SWHT': (0, 50),  # SWELL HEIGHT
+    'SWPR': (0, 20),  # SWELL PERIOD
+    'TEMP': (0, 50),  # Sea temperature
+    'VAVH': (0, 20),  # AVER. HEIGHT HIGHEST 1/3 WAVE
+    'VAVT': (0, 20),  # AVER. PERIOD HIGHEST 1/3 WAVE
+    'VCMX': (0, 20),  # MAX CREST TROUGH WAVE HEIGHT
+    'VDIR': (0, 360),  # wave direction rel. true north
+    'VEPK': (0, 100),  # WAVE SPECTRUM PEAK ENERGY
+    'VHM0': (0, 20),  # SPECTRAL SIGNIFICANT WAVE HEIGHT
+    'VMDR': (0, 360),  # Mean wave direction
+    'VPED': (0, 360),  # dir. spreading at wave peak
+    'VPSP': (0, 360),  # dir. spreading at wave peak
+    'VSMC': (0, 20),  # SPECTUM MOMENT(0, 2) WAVE PERIOD
+    'VTDH': (0, 40),  # significant wave height
+    'VTM02': (0, 13),  # Spectral moments (0, 2) wave period (Tm02)
+    'VTPK': (0, 40),  # WAVE SPECTRUM PEAK PERIOD
+    'VTZA': (0, 40),  # AVER ZERO CROSSING WAVE PERIOD
+    'VTZM': (0, 40),  # period of the highest wave
+    'VZMX': (0, 20),  # Maximum zero crossing wave height
+    'WDIR': (0, 360),  # Wind from direction relative true north
+    'WSPD': (0, 50),  # Horizontal wind speed
+}
 
-def qc_range_test(self, parameters=None, limits=None, flag=4, inplace=True):
+
+def range_algo(values, limits, signals, flag):
+    """
+    It writes flag on signals where values are out of limits.
+    """
+    signals = signals.copy()
+    signals[(values < limits[0]) | (values > limits[1])] = flag
+    return signals
+
+
+def limits_table(limits, parameters):
+    """
+    It returns the limits as a table with one row for each parameter, depth band and month.
+
+    Parameters
+    ----------
+        limits: None, tuple, dict, str or pandas.DataFrame
+            None: limits of RANGES.
+            tuple: (min value, max value) for all the parameters.
+            dict: {parameter: (min value, max value)}.
+            str: path of a CSV file with the columns of the table.
+            pandas.DataFrame: table with the columns 'parameter', 'min' and 'max', and the
+            optional columns 'depth' (start of the depth band) and 'month' (1 to 12).
+        parameters: list of str
+            Parameters to test.
+
+    Returns
+    -------
+        table: pandas.DataFrame
+            Columns 'parameter', 'depth', 'month', 'min' and 'max'. Depth is -inf and month is
+            NaN when the limits are valid for all depths or for all months.
+    """
+    if limits is None or (isinstance(limits, (tuple, list, dict)) and not limits):
+        limits = {parameter: RANGES[parameter] for parameter in parameters
+                  if parameter in RANGES}
+    elif isinstance(limits, (tuple, list)):
+        limits = {parameter: limits for parameter in parameters}
+
+    if isinstance(limits, dict):
+        table = pd.DataFrame(
+            [(parameter, value[0], value[1]) for parameter, value in limits.items()],
+            columns=['parameter', 'min', 'max'])
+    elif isinstance(limits, str):
+        table = pd.read_csv(limits)
+    else:
+        table = pd.DataFrame(limits)
+
+    missing = {'parameter', 'min', 'max'} - set(table.columns)
+    if missing:
+        raise KeyError(f"The table of limits does not have the columns {sorted(missing)}.")
+    if 'depth' not in table.columns:
+        table['depth'] = -np.inf
+    if 'month' not in table.columns:
+        table['month'] = np.nan
+    table['depth'] = table['depth'].fillna(-np.inf)
+
+    table = table[table['parameter'].isin(parameters)]
+    return table[['parameter', 'depth', 'month', 'min', 'max']].reset_index(drop=True)
+
+
+def limits_lookup(table):
+    """
+    It returns the limits of one parameter as arrays indexed by depth band and month.
+
+    Parameters
+    ----------
+        table: pandas.DataFrame
+            Rows of limits_table() of one parameter.
+
+    Returns
+    -------
+        (edges, lower, upper): (numpy.array, numpy.array, numpy.array)
+            edges are the sorted starts of the depth bands. lower and upper have shape
+            (number of bands, 12), and they are NaN where there are no limits. The limits of a
+            month replace the limits of all months of the same band.
+    """
+    edges = np.unique(table['depth'].to_numpy(dtype=float))
+    lower = np.full((len(edges), 12), np.nan)
+    upper = np.full((len(edges), 12), np.nan)
+    bands = np.searchsorted(edges, table['depth'].to_numpy(dtype=float))
+    months = table['month'].to_numpy(dtype=float)
+    minimums = table['min'].to_numpy(dtype=float)
+    maximums = table['max'].to_numpy(dtype=float)
+
+    # Limits for all months first, so the limits of a month replace them
+    rows = np.isnan(months)
+    lower[bands[rows]] = minimums[rows, None]
+    upper[bands[rows]] = maximums[rows, None]
+    rows = ~rows
+    lower[bands[rows], months[rows].astype(int) - 1] = minimums[rows]
+    upper[bands[rows], months[rows].astype(int) - 1] = maximums[rows]
+    return edges, lower, upper
+
+
+def row_bands(depth_codes, depths, edges):
+    """
+    It returns the depth band of each row, or -1 for the rows that are not in any band.
+
+    Parameters
+    ----------
+        depth_codes: numpy.array of int
+            Code of the DEPTH of each row (-1 for missing DEPTH), from pandas.factorize().
+        depths: numpy.array of float
+            Unique values of DEPTH.
+        edges: numpy.array
+            Starts of the depth bands, from limits_lookup().
+
+    Returns
+    -------
+        bands: numpy.array of int
+            If there is only one band for all depths, it returns None.
+    """
+    if len(edges) == 1 and edges[0] == -np.inf:
+        return None
+    # Bands of the unique depths, and of the missing depth (code -1) at the end
+    unique_bands = np.searchsorted(edges, depths, side='right') - 1
+    missing_band = 0 if edges[0] == -np.inf else -1
+    unique_bands = np.append(unique_bands, missing_band)
+    return unique_bands[depth_codes]
+
+
+def row_months(index):
+    """
+    It returns the month of each row (0 to 11), from the TIME index. Rows without TIME (NaT)
+    get -1.
+    """
+    times = index.get_level_values('TIME')
+    months = np.asarray(times.month, dtype=float) - 1
+    return np.where(np.asarray(times.isna()), -1, months).astype(int)
+
+
+def range_mask(values, lower, upper, bands, months):
+    """
+    It returns True where values are out of the limits of the depth band and month of the row.
+    Rows without limits are not tested.
+
+    Parameters
+    ----------
+        values: numpy.array
+        lower, upper: numpy.array
+            Limits by depth band and month, from limits_lookup().
+        bands: numpy.array of int or None
+            Depth band of each row, from row_bands().
+        months: numpy.array of int or None
+            Month of each row (0 to 11, -1 for missing TIME), from row_months(). It is None if
+            the limits do not change with the month.
+
+    Returns
+    -------
+        mask: numpy.array of bool
+    """
+    if bands is None and months is None:
+        # The same limits for all the rows
+        return (values < lower[0, 0]) | (values > upper[0, 0])
+    tested = np.ones(len(values), dtype=bool)
+    if bands is None:
+        bands = np.zeros(len(values), dtype=int)
+    else:
+        tested &= bands >= 0
+        bands = np.where(tested, bands, 0)
+    if months is None:
+        row_lower = lower[bands, 0]
+        row_upper = upper[bands, 0]
+    else:
+        tested &= months >= 0
+        months = np.where(months >= 0, months, 0)
+        row_lower = lower[bands, months]
+        row_upper = upper[bands, months]
+    return tested & ((values < row_lower) | (values > row_upper))
+
+
+def range_step(values, index, table):
+    """
+    Range test of rows with the limits table of one parameter (see limits_table()).
+    """
+    if table.empty:
+        return np.zeros(len(values), dtype=bool)
+    edges, lower, upper = limits_lookup(table)
+    if len(edges) == 1 and edges[0] == -np.inf:
+        bands = None
+    else:
+        depth_codes, depths = pd.factorize(index.get_level_values('DEPTH'))
+        bands = row_bands(depth_codes, np.asarray(depths, dtype=float), edges)
+    if table['month'].notna().any():
+        months = row_months(index)
+    else:
+        months = None
+    return range_mask(values, lower, upper, bands, months)
+
+
+def qc_range_test(self, parameters=None, limits=None, flag=4, inplace=True, n_jobs=1):
     """
     Check if the values of a parameter are out of range.
+    The limits can change with the depth and the month, like the climatology limits of the
+    QARTOD gross range test.
 
     Parameters
     ----------
@@ -12,86 +250,77 @@ def qc_range_test(self, parameters=None, limits=None, flag=4, inplace=True):
             key of self.data to apply the test.
         flag: int, optional (flag = 4)
             Flag value to write in on the fail values.
-        limits: tuple, optional (limits = None)
-            (Min value, max value) of the range of correct values.
+        limits: tuple, dict, str or pandas.DataFrame, optional (limits = None)
+            (Min value, max value) of the range of correct values, or dictionary
+            {parameter: (min value, max value)}. If it is None, the limits of RANGES are used.
+            It can also be a table of limits (pandas.DataFrame or path of a CSV file) with the
+            columns 'parameter', 'min' and 'max', and the optional columns 'depth' (start of
+            the depth band, the band ends at the next start) and 'month' (1 to 12). Rows without
+            month are valid for all months. Values without limits, and values without TIME
+            (NaT) when there are monthly limits, are not tested.
+            Ex: pd.DataFrame({'parameter': ['TEMP', 'TEMP', 'TEMP'], 'depth': [0, 0, 100],
+            'month': [None, 8, None], 'min': [10, 18, 12], 'max': [25, 30, 15]})
         inplace: bool
             If True, it changes the flags in place and returns True.
             Otherwhise it returns an other WaterFrame.
+        n_jobs: int, optional (n_jobs = 1)
+            Number of threads used to test the parameters in parallel. If it is -1, it uses all
+            the CPUs.
 
     Returns
     -------
         new_wf: WaterFrame
     """
-    ranges = {
-        'ATMP': (600, 1500),  # atmospheric pressure at altitude
-        'ATMS': (0, 2000),  # Atmospheric pressure at sea level
-        'CHLT': (0, 30),  # total chlorophyll
-        'CNDC': (0, 30),  # electrical conductivity
-        'DRYT': (-20, 60),  # air temperature at sea level
-        'GSPD': (0, 40),  # gust wind speed
-        'HCDT': (0, 360),  # current to direction relative true north
-        'HEAD': (0, 360),  # PLAT. HEADING REL. TRUE NORTH
-        'LINC': (0, 3000),  # long-wave incoming radiation
-        'LW': (0, 50),  # Downwelling vector radiance as energy
-        'OSAT': (0, 200),  # oxygen saturation
-        'PHPH': (0, 14),  # ph
-        'PRES': (0, 500),  # sea pressure
-        'PRRT': (0, 200),  # hourly precipitation rate
-        'PSAL': (0, 40),  # practical salinity
-        'RDIN': (0, 1100),  # incident radiation
-        'SVEL': (130, 180000),  # sound velocity
-        'SWDR': (0, 360),  # SWELL DIRECTION REL TRUE N.
-        'SWHT': (0, 50),  # SWELL HEIGHT
-        'SWPR': (0, 20),  # SWELL PERIOD
-        'TEMP': (0, 50),  # Sea temperature
-        'VAVH': (0, 20),  # AVER. HEIGHT HIGHEST 1/3 WAVE
-        'VAVT': (0, 20),  # AVER. PERIOD HIGHEST 1/3 WAVE
-        'VCMX': (0, 20),  # MAX CREST TROUGH WAVE HEIGHT
-        'VDIR': (0, 360),  # wave direction rel. true north
-        'VEPK': (0, 100),  # WAVE SPECTRUM PEAK ENERGY
-        'VHM0': (0, 20),  # SPECTRAL SIGNIFICANT WAVE HEIGHT
-        'VMDR': (0, 360),  # Mean wave direction
-        'VPED': (0, 360),  # dir. spreading at wave peak
-        'VPSP': (0, 360),  # dir. spreading at wave peak
-        'VSMC': (0, 20),  # SPECTUM MOMENT(0, 2) WAVE PERIOD
-        'VTDH': (0, 40),  # significant wave height
-        'VTM02': (0, 13),  # Spectral moments (0, 2) wave period (Tm02)
-        'VTPK': (0, 40),  # WAVE SPECTRUM PEAK PERIOD
-        'VTZA': (0, 40),  # AVER ZERO CROSSING WAVE PERIOD
-        'VTZM': (0, 40),  # period of the highest wave
-        'VZMX': (0, 20),  # Maximum zero crossing wave height
-        'WDIR': (0, 360),  # Wind from direction relative true north
-        'WSPD': (0, 50),  # Horizontal wind speed
-    }
-
     if parameters is None:
         parameters = self.parameters
     elif isinstance(parameters, str):
         parameters = [parameters]
 
-    data = self.data.copy()
-
-    for parameter in parameters:
-        if limits:
-            # Parameter can be an index
-            if parameter in data.index.names:
-                data.loc[
-                    self.data.index.get_level_values(
-                        parameter) < limits[0], parameter + '_QC'] = flag
-                data.loc[
-                    self.data.index.get_level_values(
-                        parameter) > limits[1], parameter + '_QC'] = flag
-            else:
-                data.loc[self.data[parameter] < limits[0], parameter + '_QC'] = flag
-                data.loc[self.data[parameter] > limits[1], parameter + '_QC'] = flag
-        elif parameter in ranges.keys():
-            self.data.loc[self.data[parameter] < ranges[parameter][0], parameter + '_QC'] = flag
-            self.data.loc[self.data[parameter] > ranges[parameter][1], parameter + '_QC'] = flag
-    
+    table = limits_table(limits, parameters)
+
+    # Only the QC columns are replaced, so the columns of values can be shared
+    data = copy_data(self.data, shared=inplace)
+    index = data.index
+
+    # Depth and month of the rows, calculated once for all the parameters
+    if (table['depth'] > -np.inf).any():
+        if 'DEPTH' not in index.names:
+            raise KeyError('DEPTH must be an index of WaterFrame.data to use depth bands.')
+        depth_codes, depths = pd.factorize(index.get_level_values('DEPTH'))
+        depths = np.asarray(depths, dtype=float)
+    else:
+        depth_codes, depths = None, None
+    if table['month'].notna().any():
+        if 'TIME' not in index.names:
+            raise KeyError('TIME must be an index of WaterFrame.data to use monthly limits.')
+        months = row_months(index)
+    else:
+        months = None
+
+    def test(parameter, parameter_table, signals):
+        # Parameter can be an index
+        if parameter in index.names:
+            values = index.get_level_values(parameter).values
+        else:
+            values = data[parameter].values
+        edges, lower, upper = limits_lookup(parameter_table)
+        bands = row_bands(depth_codes, depths, edges)
+        signals = signals.copy()
+        signals[range_mask(values, lower, upper, bands, months)] = flag
+        return signals
+
+    tasks = []
+    for parameter, parameter_table in table.groupby('parameter', sort=False):
+        tasks.append((parameter, parameter_table, data[parameter + '_QC'].values))
+
+    results = run_tasks(test, tasks, n_jobs=n_jobs, backend='thread')
+    for (parameter, _, _), signals in zip(tasks, results):
+        data[parameter + '_QC'] = signals
+
     if inplace:
         self.data = data
         return True
     else:
-        new_wf = self.copy()
+        new_wf = self.copy(deep=False)
         new_wf.data = data
         return new_wf
@@ -1,5 +1,92 @@
 """ Implementation of wf.qc_replace() """
 import numpy as np
+from ._parallel import depth_groups
+from ..analysis.copy import copy_data
+
+
+def replacements(to_replace, value):
+    """
+    It returns the list of (flag to replace, new flag) pairs.
+
+    Parameters
+    ----------
+        to_replace: int or dict
+            QC value to replace or dictionary {QC value to replace: new QC value}.
+        value: int
+            New QC value. It is not used if to_replace is a dictionary.
+
+    Returns
+    -------
+        pairs: list of tuples
+    """
+    if isinstance(to_replace, dict):
+        return list(to_replace.items())
+    return [(to_replace, value)]
+
+
+def replace_flags(signals, pairs, mask=None):
+    """
+    It writes the new flags directly into signals. All the masks are calculated before writing,
+    so a flag that has been replaced is not replaced again ({0: 1, 1: 2} changes 0 to 1 and
+    1 to 2).
+
+    Parameters
+    ----------
+        signals: numpy.array
+            Flags to change.
+        pairs: list of tuples
+            (flag to replace, new flag) pairs from replacements().
+        mask: numpy.array of bool, optional (mask = None)
+            Positions that can be changed. If mask is None, all positions can be changed.
+
+    Returns
+    -------
+        signals: numpy.array
+    """
+    masks = []
+    for old, new in pairs:
+        found = signals == old
+        if mask is not None:
+            found &= mask
+        masks.append((found, new))
+    for found, new in masks:
+        signals[found] = new
+    return signals
+
+
+def change_signals(signals, to_replace, value, start):
+    """
+    It changes the flags equal to to_replace by value, from the position start.
+    """
+    signals = np.array(signals)
+    mask = np.arange(len(signals)) >= start
+    return replace_flags(signals, replacements(to_replace, value), mask)
+
+
+def group_positions(groups, length):
+    """
+    It returns the position of each row inside its series (DEPTH sorted by TIME).
+
+    Parameters
+    ----------
+        groups: list of numpy.array
+            Positions of the rows of each series, from depth_groups().
+        length: int
+            Number of rows.
+
+    Returns
+    -------
+        rank: numpy.array of int
+            Position of each row inside its series. It is -1 for the rows that are not in any
+            series.
+    """
+    rank = np.full(length, -1, dtype=np.int64)
+    if groups:
+        order = np.concatenate(groups)
+        sizes = np.array([len(positions) for positions in groups])
+        offsets = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        rank[order] = np.arange(len(order)) - offsets
+    return rank
 
 
 def qc_replace(self, parameters=None, to_replace=0, value=1, start=0, inplace=True):
@@ -10,10 +97,14 @@ def qc_replace(self, parameters=None, to_replace=0, value=1, start=0, inplace=Tr
     ----------
         parameters: None, str or list of str.
             List of parameters to change the values of QC. Ex: ['TEMP', 'PSAL'].
-        to_replace: int
-            QC value to replace.
+        to_replace: int or dict
+            QC value to replace. It can be a dictionary to make several replacements at once.
+            Ex: {0: 1, 9: 4}.
         value: int
-            Value to replace any values matching to_replace with.
+            Value to replace any values matching to_replace with. It is not used if to_replace
+            is a dictionary.
+        start: int
+            Position, inside the time series of each depth, of the first flag to replace.
         inplace: bool
             If inplace, makes changes inplace and returns True.
             Otherwhise, returns a new WaterFrame.
@@ -22,58 +113,32 @@ def qc_replace(self, parameters=None, to_replace=0, value=1, start=0, inplace=Tr
     -------
         new_wf: WaterFrame
     """
-    def change_signals(signals):
-         # Change flags
-        result = []
-        for i, signal in enumerate(signals):
-            if i < start:
-                result.append(signal)
-            else:
-                if signal == to_replace:
-                    result.append(value)
-                else:
-                    result.append(signal)
-
-        return np.array(result)
-
     if parameters is None:
         parameters = self.parameters
     elif isinstance(parameters, str):
         parameters = [parameters]
 
-    data = self.data.copy()
-
-    for parameter in parameters:
-        
-        # New
-        df = data[[parameter, f'{parameter}_QC']].reset_index()
-        df.set_index('TIME', inplace=True)
-
-        try:
-            for depth, df_depth in df.groupby('DEPTH'):
-                df_depth.sort_index(inplace=True)
-
-                signals = df_depth[f'{parameter}_QC'].values
-
-                # Change flags
-                result = change_signals(signals)
+    # Only the QC columns are replaced, so the columns of values can be shared
+    data = copy_data(self.data, shared=inplace)
 
-                # Asignation of result with numpy array due to
-                # AttributeError: 'list' object has no attribute 'ravel'
-                data.loc[(depth,), f'{parameter}_QC'] = np.array(result)
-        except KeyError:
-            # No Depth
-            signals = df[f'{parameter}_QC'].values
+    # Rows that can be changed: from the position start of each series
+    if start > 0:
+        mask = group_positions(depth_groups(data), len(data)) >= start
+    elif 'DEPTH' in data.index.names:
+        # Rows without DEPTH are not in any series
+        mask = data.index.get_level_values('DEPTH').notna()
+    else:
+        mask = None
+    pairs = replacements(to_replace, value)
 
-            # Change flags
-            result = change_signals(signals)
-            
-            data[f'{parameter}_QC'] = result
+    for parameter in parameters:
+        signals = data[f'{parameter}_QC'].to_numpy(copy=True)
+        data[f'{parameter}_QC'] = replace_flags(signals, pairs, mask)
 
     if inplace:
         self.data = data
         return True
     else:
-        new_wf = self.copy()
+        new_wf = self.copy(deep=False)
         new_wf.data = data
-        return new_wf
\ No newline at end of file
+        return new_wf
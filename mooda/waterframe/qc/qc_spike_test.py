@@ -1,9 +1,233 @@
 """ Implementation of WaterFrame.qc_spike_test(parameters=None, window=0, threshold=3, flag=4)"""
+import math
 import numpy as np
+from ._parallel import depth_groups, run_tasks
+from ..analysis.copy import copy_data
+
+
+def thresholding_algo(y, lag, threshold, influence, signals, flag):
+    """
+    Original implementation of the z-score algorithm. It recalculates the mean and the standard
+    deviation of the window for each value, so it takes O(n * lag) operations.
+    """
+    if len(y) < lag:
+        return np.asarray(signals)
+    filteredY = np.array(y)
+    avgFilter = [0]*len(y)
+    stdFilter = [0]*len(y)
+    avgFilter[lag - 1] = np.mean(y[0:lag])
+    stdFilter[lag - 1] = np.std(y[0:lag])
+    for i in range(lag, len(y)):
+        if abs(y[i] - avgFilter[i-1]) > threshold * stdFilter [i-1]:
+            signals[i] = flag
+
+            filteredY[i] = influence * y[i] + (1 - influence) * filteredY[i-1]
+            avgFilter[i] = np.mean(filteredY[(i-lag+1):i+1])
+            stdFilter[i] = np.std(filteredY[(i-lag+1):i+1])
+        else:
+            filteredY[i] = y[i]
+            avgFilter[i] = np.mean(filteredY[(i-lag+1):i+1])
+            stdFilter[i] = np.std(filteredY[(i-lag+1):i+1])
+
+    return np.asarray(signals)
+
+
+def spike_scan(y, lag, threshold, influence, state=None):
+    """
+    Core of running_thresholding_algo(). It can continue the scan of a series from the state
+    returned by a previous call, so a series can be tested in blocks with the same results as
+    the whole series.
+
+    Parameters
+    ----------
+        y: numpy.array
+            Values of the series (or the next values of the series if state is not None).
+        lag, threshold, influence:
+            Arguments of running_thresholding_algo().
+        state: dict, optional (state = None)
+            State returned by the previous call for the same series.
+
+    Returns
+    -------
+        (flagged, state): (list of int, dict)
+            Positions of y with signals, and state of the scan after the last value of y.
+    """
+    y = np.asarray(y)
+    if state is None:
+        dtype = y.dtype if y.dtype.kind in 'iuf' else np.dtype(np.float64)
+        state = {'count': 0, 'shift': None, 'window': [], 'total': 0.0, 'total_sq': 0.0,
+                 'nans': 0, 'is_int': dtype.kind in 'iu', 'dtype': dtype.str}
+    is_int = state['is_int']
+    # Values of thresholding_algo() are in the dtype of y
+    dtype = np.dtype(state.get('dtype', np.int64 if is_int else np.float64))
+    values = np.asarray(y, dtype=np.float64)
+    shift = state['shift']
+    if shift is None:
+        # Until the first valid value, all values are NaN and the shift does not change them
+        finite = values[~np.isnan(values)]
+        if len(finite):
+            shift = float(finite[0])
+    shift_value = 0.0 if shift is None else shift
+
+    # filtered holds the last 'lag' values of the previous calls and the values of y
+    offset = len(state['window'])
+    filtered = state['window'] + (values - shift_value).tolist()
+    ys = filtered[:]
+    # Filtered values without the shift, as in thresholding_algo()
+    raw = state.get('raw', [value + shift_value for value in state['window']]) + \
+        values.tolist()
+    # Differences closer to the threshold than this relative tolerance are ties, and they are
+    # checked with the mean and the standard deviation of thresholding_algo()
+    tolerance = 0.1 * math.sqrt(np.finfo(np.float64 if is_int else dtype).eps)
+    # Position in the whole series of the first value of filtered
+    base = state['count'] - offset
+    n = len(filtered)
+    flagged = []
+    nan = math.nan
+    isnan = math.isnan
+    total, total_sq, nans = state['total'], state['total_sq'], state['nans']
+
+    def window_sums(start, end):
+        total = 0.0
+        total_sq = 0.0
+        nans = 0
+        for value in filtered[start:end]:
+            if isnan(value):
+                nans += 1
+            else:
+                total += value
+                total_sq += value * value
+        return total, total_sq, nans
+
+    def signal(i):
+        # Test of thresholding_algo() with the window before position i
+        window = np.array(raw[i - lag:i], dtype=dtype)
+        return abs(y[i - offset] - np.mean(window)) > threshold * np.std(window)
+
+    def equal_run(start, end):
+        # Number of equal values at the end of filtered[start:end]
+        run = 0
+        for value in reversed(filtered[start:end]):
+            if run and value != filtered[end - 1]:
+                break
+            run += 1
+        return run
+
+    def mean_std(last):
+        if nans:
+            return nan, nan
+        if run >= lag:
+            # Constant window: the running sums can differ from the value by a rounding error
+            return last, 0.0
+        mean = total / lag
+        variance = total_sq / lag - mean * mean
+        return mean, math.sqrt(variance) if variance > 0 else 0.0
+
+    if base + n >= lag:
+        if base + offset < lag:
+            # First window of the series
+            first = lag - base
+            total, total_sq, nans = window_sums(0, first)
+        else:
+            first = offset
+        run = equal_run(first - lag, first)
+
+        avg, std = mean_std(filtered[first - 1])
+        for i in range(first, n):
+            y_i = ys[i]
+            distance = abs(y_i - avg)
+            limit = threshold * std
+            if abs(distance - limit) <= tolerance * (
+                    abs(y_i + shift_value) + abs(avg + shift_value) + limit):
+                spike = signal(i)
+            else:
+                spike = distance > limit
+            if spike:
+                flagged.append(i - offset)
+                # In the dtype of y, as the values of thresholding_algo()
+                raw[i] = np.array(influence * y[i - offset] +
+                                  (1 - influence) * dtype.type(raw[i - 1]), dtype=dtype).item()
+                value = raw[i] - shift_value
+            else:
+                value = y_i
+            filtered[i] = value
+            run = run + 1 if value == filtered[i - 1] else 1
+
+            if (base + i) % lag == 0:
+                total, total_sq, nans = window_sums(i - lag + 1, i + 1)
+            else:
+                old = filtered[i - lag]
+                if isnan(old):
+                    nans -= 1
+                else:
+                    total -= old
+                    total_sq -= old * old
+                if isnan(value):
+                    nans += 1
+                else:
+                    total += value
+                    total_sq += value * value
+            avg, std = mean_std(value)
+
+    state = {'count': base + n, 'shift': shift, 'is_int': is_int, 'dtype': dtype.str,
+             'window': filtered[-lag:], 'raw': raw[-lag:], 'total': total, 'total_sq': total_sq,
+             'nans': nans}
+    return flagged, state
+
+
+def running_thresholding_algo(y, lag, threshold, influence, signals, flag):
+    """
+    Same algorithm as thresholding_algo() but the mean and the standard deviation of the window
+    are updated with running sums and sums of squares of the filtered signal, so it takes O(n)
+    operations. Values are shifted by the first valid value of the series to avoid cancellation
+    errors, and the sums are recalculated every 'lag' values to avoid the accumulation of rounding
+    errors. NaNs are counted apart: the mean and the standard deviation of a window with NaNs are
+    NaN, as with np.mean() and np.std(). The length of the last run of equal values is also
+    counted, and a window of equal values has that value as mean and a standard deviation of 0.
+    Values whose distance to the mean is the threshold (ties, common with quantized data) up to
+    rounding errors are tested again with the mean and the standard deviation of the window as
+    in thresholding_algo(), so both engines give the same flags.
+    """
+    signals = np.asarray(signals)
+    if len(y) < lag:
+        return signals
+
+    flagged, _ = spike_scan(y, lag, threshold, influence)
+    signals[flagged] = flag
+    return signals
+
+
+def get_engine(engine):
+    """
+    It returns the function of the input engine ('running' or 'loop').
+    """
+    engines = {
+        'running': running_thresholding_algo,
+        'loop': thresholding_algo,
+    }
+    try:
+        return engines[engine]
+    except KeyError:
+        raise ValueError(f"engine must be one of {list(engines.keys())}, not '{engine}'")
+
+
+def auto_window(window, length):
+    """
+    It returns the window of the test. If window is 0, the window is the 5% of length, with a
+    minimum value of 3 and a maximum value of 100.
+    """
+    # Auto calculation of window
+    if window == 0:
+        window = round(length*5/100)  # 5% of len
+        if window < 3:
+            window = 3
+        elif window > 100:
+            window = 100
+    return window
 
 
 def qc_spike_test(self, parameters=None, window=0, threshold=3.5, influence=0.5, flag=4,
-                  inplace=True):
+                  inplace=True, engine='running', n_jobs=1):
     """
     Based on:
     https://stackoverflow.com/questions/22583391/peak-signal-detection-in-realtime-timeseries-data
@@ -40,82 +264,54 @@ def qc_spike_test(self, parameters=None, window=0, threshold=3.5, influence=0.5,
         inplace: bool
             If True, it changes the flags in place and returns True.
             Otherwhise it returns an other WaterFrame.
+        engine: str, optional (engine = 'running')
+            Implementation of the algorithm. Options:
+            'running': O(n) implementation with running sums of the moving window.
+            'loop': Original implementation that recalculates the mean and the standard
+            deviation of each window. It is slower, but it can be used to check the results
+            of the 'running' engine.
+        n_jobs: int, optional (n_jobs = 1)
+            Number of processes used to test the series of each parameter and depth in
+            parallel. If it is -1, it uses all the CPUs.
 
     Returns
     -------
         new_wf: WaterFrame.
     """
-
-    def thresholding_algo(y, lag, threshold, influence, signals, flag):
-        filteredY = np.array(y)
-        avgFilter = [0]*len(y)
-        stdFilter = [0]*len(y)
-        avgFilter[lag - 1] = np.mean(y[0:lag])
-        stdFilter[lag - 1] = np.std(y[0:lag])
-        for i in range(lag, len(y)):
-            if abs(y[i] - avgFilter[i-1]) > threshold * stdFilter [i-1]:
-                signals[i] = flag
-
-                filteredY[i] = influence * y[i] + (1 - influence) * filteredY[i-1]
-                avgFilter[i] = np.mean(filteredY[(i-lag+1):i+1])
-                stdFilter[i] = np.std(filteredY[(i-lag+1):i+1])
-            else:
-                filteredY[i] = y[i]
-                avgFilter[i] = np.mean(filteredY[(i-lag+1):i+1])
-                stdFilter[i] = np.std(filteredY[(i-lag+1):i+1])
-
-        return np.asarray(signals)
+    algo = get_engine(engine)
 
     if parameters is None:
         parameters = self.parameters
     elif isinstance(parameters, str):
         parameters = [parameters]
 
-    data = self.data.copy()
+    # Only the QC columns are replaced, so the columns of values can be shared
+    data = copy_data(self.data, shared=inplace)
+    groups = depth_groups(data)
 
+    tasks = []
     for parameter in parameters:
-        # Auto calculation of window
-        if window == 0:
-            window = round(len(data[parameter])*5/100)  # 5% of len
-            if window < 3:
-                window = 3
-            elif window > 100:
-                window = 100
-
-        df = data[[parameter, f'{parameter}_QC']].reset_index()
-        df.set_index('TIME', inplace=True)
-
-        try:
-            for depth, df_depth in df.groupby('DEPTH'):
-                df_depth.sort_index(inplace=True)
-
-                y = df_depth[parameter].values
-                signals = df_depth[f'{parameter}_QC'].values
-
-                # Run algo with settings from above
-                result = thresholding_algo(y, lag=window, threshold=threshold,
-                                        influence=influence, signals=signals,
-                                        flag=flag)
-                
-                data.loc[(depth,), f'{parameter}_QC'] = result
-        except KeyError:
-            # No Depth
-            y = df[parameter].values
-            signals = df[f'{parameter}_QC'].values
-
-            # Run algo with settings from above
-            result = thresholding_algo(y, lag=window, threshold=threshold,
-                                    influence=influence, signals=signals,
-                                    flag=flag)
-            
-            data[f'{parameter}_QC'] = result
-    
+        window = auto_window(window, len(data[parameter]))
+
+        values = data[parameter].values
+        signals = data[f'{parameter}_QC'].values
+        for positions in groups:
+            tasks.append((values[positions], window, threshold, influence,
+                          signals[positions], flag))
+
+    # Run algo with settings from above
+    results = iter(run_tasks(algo, tasks, n_jobs=n_jobs, backend='process'))
+
+    for parameter in parameters:
+        signals = data[f'{parameter}_QC'].values.copy()
+        for positions in groups:
+            signals[positions] = next(results)
+        data[f'{parameter}_QC'] = signals
+
     if inplace:
         self.data = data
         return True
     else:
-        new_wf = self.copy()
+        new_wf = self.copy(deep=False)
         new_wf.data = data
         return new_wf
-
-    return True
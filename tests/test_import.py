@@ -0,0 +1,50 @@
+""" Tests of the time and the modules of 'import mooda' """
+import os
+import subprocess
+import sys
+
+# Libraries that must not be imported by 'import mooda'
+HEAVY_MODULES = ['xarray', 'netCDF4', 'gsw', 'flask', 'elasticsearch', 'matplotlib', 'plotly',
+                 'sklearn', 'scipy', 'statsmodels', 'stockstats', 'ipywidgets', 'requests']
+
+# Maximum time of the modules of mooda, without the libraries that they import (seconds)
+MOODA_BUDGET = 0.1
+
+# Folder that contains the package, so the subprocess imports the same mooda
+FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times():
+    """
+    It imports mooda with 'python -X importtime' in a new Python process.
+
+    Returns
+    -------
+        times: dict
+            {module: self import time in microseconds}.
+    """
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import mooda'],
+                            check=True, capture_output=True, text=True, cwd=FOLDER).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, _, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(self_time)
+    return times
+
+
+def test_import_does_not_load_heavy_modules():
+    times = import_times()
+    imported = {module.split('.')[0] for module in times}
+
+    assert 'mooda' in imported
+    assert sorted(imported.intersection(HEAVY_MODULES)) == []
+
+
+def test_import_time_of_mooda_modules():
+    times = import_times()
+    mooda_time = sum(time for module, time in times.items()
+                     if module.split('.')[0] == 'mooda')
+
+    assert mooda_time / 1e6 < MOODA_BUDGET
@@ -0,0 +1,163 @@
+""" Tests of WaterFrame.to_es() with a fake ElasticSearch client """
+import importlib
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from elasticsearch import exceptions
+import mooda as md
+
+to_es_module = importlib.import_module('mooda.waterframe.output.to_es')
+
+
+class FakeIndices:
+    """
+    Index API of FakeElasticsearch.
+    """
+    def __init__(self, es):
+        self.es = es
+
+    def exists(self, index):
+        return index in self.es.refresh_intervals
+
+    def create(self, index, body):
+        self.es.refresh_intervals[index] = body['settings']['index']['refresh_interval']
+
+    def get_settings(self, index, name, include_defaults=False):
+        value = self.es.refresh_intervals[index]
+        settings = {'index': {'refresh_interval': value}} if value is not None else {}
+        return {index: {'settings': settings,
+                        'defaults': {'index': {'refresh_interval': '1s'}}}}
+
+    def put_settings(self, index, body):
+        self.es.refresh_intervals[index] = body['index']['refresh_interval']
+
+    def refresh(self, index):
+        self.es.refreshes.append(index)
+
+
+class FakeElasticsearch:
+    """
+    Client that saves the documents of the bulk requests in memory.
+
+    Parameters
+    ----------
+        busy: int
+            Number of documents of each of the first bulk requests rejected with status 429.
+        busy_requests: int
+            Number of bulk requests with rejected documents.
+        fail_after: int
+            Number of bulk requests before the connection fails in all the next ones.
+    """
+    def __init__(self, busy=0, busy_requests=0, fail_after=None):
+        self.busy = busy
+        self.busy_requests = busy_requests
+        self.fail_after = fail_after
+        self.documents = {}
+        self.requests = []
+        self.refresh_intervals = {}
+        self.refreshes = []
+        self.indices = FakeIndices(self)
+
+    def bulk(self, body):
+        if self.fail_after is not None and len(self.requests) >= self.fail_after:
+            raise exceptions.ConnectionError('Connection refused')
+        lines = body.decode('utf-8').splitlines()
+        actions = [json.loads(line)['index'] for line in lines[::2]]
+        self.requests.append({'size': len(actions),
+                              'refresh_interval': {index: self.refresh_intervals.get(index)
+                                                   for index in self.refresh_intervals}})
+        items = []
+        rejected = self.busy if self.busy_requests > 0 else 0
+        self.busy_requests -= 1
+        for position, (action, source) in enumerate(zip(actions, lines[1::2])):
+            if position < rejected:
+                items.append({'index': {'_id': action['_id'], 'status': 429}})
+                continue
+            self.documents[(action['_index'], action['_id'])] = json.loads(source)
+            self.refresh_intervals.setdefault(action['_index'], None)
+            items.append({'index': {'_id': action['_id'], 'status': 201}})
+        return {'errors': rejected > 0, 'items': items}
+
+
+def make_waterframe(rows=120):
+    """
+    WaterFrame with one parameter (TEMP) at one depth.
+    """
+    times = pd.date_range('2020-01-01', periods=rows, freq='h')
+    index = pd.MultiIndex.from_product([[0.0], times], names=['DEPTH', 'TIME'])
+    data = pd.DataFrame({'TEMP': np.linspace(10, 20, rows), 'TEMP_QC': 1, 'TIME_QC': 1},
+                        index=index)
+    metadata = {'id': 'TEST', 'platform_code': 'TEST', 'institution': 'UPC', 'area': 'OBSEA',
+                'last_latitude_observation': 41.18, 'last_longitude_observation': 1.75,
+                'site': 'OBSEA', 'network': 'EMSO'}
+    vocabulary = {'TEMP': {'long_name': 'sea water temperature', 'units': 'degree_Celsius'}}
+    return md.WaterFrame(df=data, metadata=metadata, vocabulary=vocabulary)
+
+
+def ingest(monkeypatch, es, wf, **kwargs):
+    monkeypatch.setattr(to_es_module, 'Elasticsearch', lambda **_: es)
+    monkeypatch.setattr(to_es_module, 'sleep', lambda _: None)
+    wf.to_es(metadata_to_es=False, summary_to_es=False, vocabulary_to_es=False,
+             chunk_size=10, thread_count=1, **kwargs)
+
+
+def test_send_chunk_retries_busy_documents():
+    es = FakeElasticsearch(busy=3, busy_requests=1)
+    es.refresh_intervals['data'] = None
+    chunk = [json.dumps({'index': {'_index': 'data', '_id': str(i)}}) + '\n{"value": 1}\n'
+             for i in range(10)]
+
+    assert to_es_module.send_chunk(es, chunk, initial_backoff=0) == 10
+    # Only the 3 rejected documents are sent again
+    assert [request['size'] for request in es.requests] == [10, 3]
+    assert len(es.documents) == 10
+
+
+def test_send_chunk_raises_when_retries_are_exhausted():
+    es = FakeElasticsearch(busy=3, busy_requests=10)
+    chunk = [json.dumps({'index': {'_index': 'data', '_id': str(i)}}) + '\n{"value": 1}\n'
+             for i in range(10)]
+
+    with pytest.raises(to_es_module.helpers.BulkIndexError):
+        to_es_module.send_chunk(es, chunk, max_retries=2, initial_backoff=0)
+    assert len(es.requests) == 3
+
+
+def test_refresh_interval_of_a_new_index(monkeypatch, tmp_path):
+    es = FakeElasticsearch()
+    ingest(monkeypatch, es, make_waterframe(), checkpoint_dir=str(tmp_path))
+
+    assert len(es.documents) == 120
+    # The index is created without refreshes before the first bulk request
+    assert all(request['refresh_interval']['data'] == '-1' for request in es.requests)
+    # and the default refresh_interval is restored at the end
+    assert es.refresh_intervals['data'] is None
+    assert es.refreshes == ['data']
+
+
+def test_refresh_interval_of_an_existing_index(monkeypatch, tmp_path):
+    es = FakeElasticsearch()
+    es.refresh_intervals['data'] = '5s'
+    ingest(monkeypatch, es, make_waterframe(), checkpoint_dir=str(tmp_path))
+
+    assert all(request['refresh_interval']['data'] == '-1' for request in es.requests)
+    assert es.refresh_intervals['data'] == '5s'
+
+
+def test_resume_from_checkpoint(monkeypatch, tmp_path):
+    wf = make_waterframe()
+    es = FakeElasticsearch(fail_after=5)
+    with pytest.raises(exceptions.ConnectionError):
+        ingest(monkeypatch, es, wf, checkpoint_dir=str(tmp_path), max_retries=0)
+    assert len(es.documents) == 50
+    # The refresh_interval is restored when the ingestion fails
+    assert es.refresh_intervals['data'] is None
+    assert len(list(tmp_path.iterdir())) == 1
+
+    es.fail_after = None
+    ingest(monkeypatch, es, wf, checkpoint_dir=str(tmp_path), resume=True)
+    # Only the documents that were not acknowledged are sent again
+    assert sum(request['size'] for request in es.requests) == 120
+    assert len(es.documents) == 120
+    assert list(tmp_path.iterdir()) == []